@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compare peak memory of the default and compact parse modes.
+
+Usage:
+    python scripts/benchmark_memory.py [file.csv ...] [--rows N]
+
+Without files, a synthetic text-heavy CSV with --rows rows is used. Peak
+memory is measured with tracemalloc, which sees pandas and numpy buffers
+but not pyarrow's allocator.
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from slackbot_poc.csv_processor import process_csv_files  # noqa: E402
+from slackbot_poc.dtypes import HAS_PYARROW  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def synthetic_csv(rows: int) -> bytes:
+    """Build a wide CSV with repetitive text, unique text and small integers."""
+    random.seed(0)
+    cities = ["Tokyo", "Osaka", "Nagoya", "Sapporo", "Fukuoka", "Kobe", "Kyoto"]
+    statuses = ["active", "inactive", "pending", "closed"]
+    lines = ["id,name,city,status,age,score,balance,comment"]
+    for i in range(rows):
+        lines.append(
+            f"{i},user_{i:08d},{random.choice(cities)},{random.choice(statuses)},"
+            f"{random.randint(18, 90)},{random.randint(0, 100)},{random.uniform(-1e4, 1e4):.2f},"
+            f"\"note {random.randint(0, 50)}, see ticket\""
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def measure(content: bytes, compact: bool):
+    """Return (output, peak bytes, seconds) for processing ``content`` once."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = process_csv_files([content], compact=compact)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="CSV files to benchmark")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows in the synthetic CSV (default: 200000)")
+    args = parser.parse_args()
+
+    inputs = [(path, Path(path).read_bytes()) for path in args.files] or [
+        (f"synthetic ({args.rows} rows)", synthetic_csv(args.rows))
+    ]
+    print(f"pyarrow: {'yes' if HAS_PYARROW else 'no'}")
+    print(f"{'file':<28} {'size MB':>8} {'default MB':>11} {'compact MB':>11} {'saved':>6} {'time x':>7} identical")
+    for name, content in inputs:
+        baseline, baseline_peak, baseline_time = measure(content, compact=False)
+        compact, compact_peak, compact_time = measure(content, compact=True)
+        print(
+            f"{name:<28} {len(content) / MB:>8.1f} {baseline_peak / MB:>11.1f} {compact_peak / MB:>11.1f} "
+            f"{1 - compact_peak / baseline_peak:>6.0%} {compact_time / baseline_time:>7.2f} {baseline == compact}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+MB = 1024 * 1024
+
+# pandas typically needs several times the on-disk size of a CSV while parsing,
+# transforming and serializing it back to text.
+DEFAULT_EXPANSION_FACTOR = 6
+DEFAULT_MEMORY_BUDGET = 2048 * MB
+DEFAULT_HARD_CAP = 1024 * MB
+BUSY_MESSAGE = "The bot is busy right now, please try again later"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a job cannot be admitted under the memory budget."""
+
+
+class AdmissionController:
+    """Track the estimated memory of in-flight jobs against a global budget.
+
+    Jobs whose estimate fits in the remaining budget are admitted by
+    try_acquire(), others are queued as waiters until a later call finds
+    enough memory released. A job larger than the whole budget
+    (but under the hard cap) only runs when nothing else is in flight, and a
+    job above the hard cap is rejected outright.
+
+    The oldest waiting job has its estimate reserved: newer jobs only start
+    if they fit next to it, so a stream of small jobs cannot starve a large
+    one. Jobs with an estimate of 0 always fit.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = DEFAULT_MEMORY_BUDGET,
+        hard_cap_bytes: int = DEFAULT_HARD_CAP,
+        expansion_factor: float = DEFAULT_EXPANSION_FACTOR,
+    ):
+        self._in_use = 0
+        self._running = 0
+        self._waiters: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.configure(budget_bytes, hard_cap_bytes, expansion_factor)
+
+    def configure(
+        self,
+        budget_bytes: int,
+        hard_cap_bytes: int,
+        expansion_factor: float = DEFAULT_EXPANSION_FACTOR,
+    ) -> None:
+        """Change the limits; they apply from the next try_acquire()."""
+        if budget_bytes <= 0 or hard_cap_bytes <= 0:
+            raise ValueError("Memory budget and hard cap must be positive")
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self.hard_cap_bytes = hard_cap_bytes
+            self.expansion_factor = expansion_factor
+
+    def estimate(self, files: List[Dict], expansion_factor: Optional[float] = None) -> int:
+        """Estimate the peak memory of a job from Slack file metadata."""
+        total_size = sum(int(file.get("size") or 0) for file in files)
+        return int(total_size * (expansion_factor or self.expansion_factor))
+
+    def check(self, estimate: int, expansion_factor: Optional[float] = None) -> None:
+        """Reject a job whose estimate exceeds the hard cap.
+
+        ``expansion_factor`` should be the one the estimate was made with, so
+        the limit in the message matches the file sizes that are accepted.
+        """
+        if estimate > self.hard_cap_bytes:
+            max_file_mb = self.hard_cap_bytes / (expansion_factor or self.expansion_factor) / MB
+            raise AdmissionRejected(f"File is too large to process (limit: {max_file_mb:.0f} MB)")
+
+    def _fits(self, estimate: int, ticket: Optional[Hashable] = None) -> bool:
+        if estimate == 0:
+            return True
+        if self._waiters:
+            oldest, reserved = next(iter(self._waiters.items()))
+            if oldest != ticket:
+                return self._in_use + min(reserved, self.budget_bytes) + estimate <= self.budget_bytes
+        if self._running == 0:
+            return True
+        return self._in_use + estimate <= self.budget_bytes
+
+    def try_acquire(self, estimate: int, ticket: Hashable) -> bool:
+        """Take ``estimate`` bytes if the job fits now, without blocking.
+
+        A job that does not fit is queued as a waiter under ``ticket`` so it
+        keeps its place for the reservation; call again to retry, and
+        withdraw() if the job is abandoned. Pair a successful call with
+        release().
+        """
+        with self._lock:
+            if not self._fits(estimate, ticket):
+                self._waiters.setdefault(ticket, estimate)
+                return False
+            self._waiters.pop(ticket, None)
+            self._in_use += estimate
+            self._running += 1
+            return True
+
+    def withdraw(self, ticket: Hashable) -> None:
+        """Forget a waiter queued by try_acquire()."""
+        with self._lock:
+            self._waiters.pop(ticket, None)
+
+    def release(self, estimate: int) -> None:
+        """Return the memory of a finished job to the budget."""
+        with self._lock:
+            self._in_use -= estimate
+            self._running -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the budget usage."""
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "in_use_bytes": self._in_use,
+                "running": self._running,
+                "waiting": len(self._waiters),
+            }
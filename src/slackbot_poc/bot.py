@@ -1,33 +1,141 @@
-import os
 import logging
+import os
 import signal
-import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from slack_sdk.socket_mode import SocketModeClient
 from slack_sdk.socket_mode.response import SocketModeResponse
 from slack_sdk.socket_mode.request import SocketModeRequest
-from dotenv import load_dotenv
-from .csv_processor import process_csv_files, format_results_for_slack
-
-load_dotenv()
+from .csv_processor import (
+    FileResult,
+    process_csv_files,
+    process_csv_files_tolerant,
+    preview_csv,
+    summarize_csv_files,
+    format_results_for_slack,
+)
+from .circuit import OPEN, CircuitBreaker, CircuitOpen
+from .downloader import SlackFileDownloader, DownloadError, is_service_failure
+from .health import HealthServer
+from .logging_config import configure_logging
+from .outbound import MessageCoalescer, TTLCache
+from .dtypes import COMPACT_EXPANSION_FACTOR
+from .parallel import PARALLEL_CHUNK_BYTES, process_csv_file_parallel
+from .stats import STATS_CHUNK_BYTES, STATS_EXPANSION_FACTOR
+from .transforms import TransformError, describe_transforms, parse_transforms
+from .admission import BUSY_MESSAGE, AdmissionController, AdmissionRejected, MB
+from .scheduler import FairScheduler
+from .config import ConfigError, RELOADABLE, Settings, load_settings
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+HELP_MESSAGE = "Please send csv file"
+PREVIEW_KEYWORD = "preview"
+STATS_KEYWORD = "stats"
+# Slack renders messages up to this length without splitting them
+SLACK_MESSAGE_LIMIT = 4000
+# Per-file log records are high volume; only every Nth one is emitted
+FILE_LOG_SAMPLE_EVERY = 10
+# Threads posting previews, separate from the job workers so previews never queue behind full jobs
+PREVIEW_THREADS = 2
+RETRY_MESSAGE = "The bot is restarting and could not finish processing your file. Please send it again in a minute."
+DEGRADED_MESSAGE = "Slack file service degraded. Please send your file again in a few minutes."
+
+
+def _in_thread(thread_ts):
+    """Keyword arguments that post into ``thread_ts``, or none for a channel message."""
+    return {"thread_ts": thread_ts} if thread_ts else {}
+
+
+def _processed_comment(description=None):
+    """Comment posted with a single processed file."""
+    if description:
+        return f"CSV file processed - {description} 📊"
+    return "CSV file processed - integer columns have been doubled! 📊"
+
 
 class SlackCSVBot:
-    def __init__(self):
-        self.client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
+    def __init__(self, settings: Settings = None, processes: int = 1):
+        """Create the bot; ``processes`` is the number of bot processes sharing this host."""
+        self.settings = (settings or load_settings()).require_tokens()
+        self.processes = processes
+        self.client = WebClient(token=self.settings.slack_bot_token, timeout=self.settings.slack_api_timeout)
         self.socket_client = SocketModeClient(
-            app_token=os.environ.get("SLACK_APP_TOKEN"),
+            app_token=self.settings.slack_app_token,
             web_client=self.client
         )
         self.socket_client.socket_mode_request_listeners.append(self.process_request)
+        self.downloader = SlackFileDownloader(self.client, self.settings.slack_bot_token)
+        self.upload_breaker = CircuitBreaker("files.upload", is_failure=is_service_failure)
+        self.breakers = {"files.download": self.downloader.breaker, "files.upload": self.upload_breaker}
+        self.health_server = None
+        self.replies = MessageCoalescer(self.post_message, max_length=SLACK_MESSAGE_LIMIT)
+        self.help_replies = TTLCache(ttl=self.settings.help_reply_ttl)
+        self.admission = AdmissionController()
+        self.scheduler = FairScheduler(admission=self.admission)
+        self.previews = ThreadPoolExecutor(max_workers=PREVIEW_THREADS, thread_name_prefix="preview")
+        self.apply_settings(self.settings)
         self.running = False
+        self.draining = threading.Event()
+        self._drain_deadline = None
+    
+    def apply_settings(self, settings: Settings):
+        """Push tunable settings to the bot and its components.
+        
+        The memory budget and parse processes are host-wide; with several bot
+        processes each gets an equal share, and no single job may exceed it.
+        """
+        self.settings = settings
+        budget = settings.memory_budget_mb * MB // self.processes
+        hard_cap = settings.max_job_memory_mb * MB
+        if self.processes > 1:
+            hard_cap = min(hard_cap, budget)
+        self.admission.configure(budget_bytes=budget, hard_cap_bytes=hard_cap)
+        self.scheduler.configure(
+            workers=settings.workers,
+            channel_limit=settings.channel_concurrency,
+            priority_channels=settings.priority_channels,
+            admission_timeout=settings.admission_timeout,
+        )
+        self.downloader.timeout = settings.download_timeout
+        self.client.timeout = settings.slack_api_timeout
+        for breaker in self.breakers.values():
+            breaker.failure_threshold = settings.breaker_failures
+            breaker.reset_timeout = settings.breaker_reset_timeout
+        self.preview_rows = settings.preview_rows
+        self.preview_min_size = settings.preview_min_size_mb * MB
+        self.drain_timeout = settings.drain_timeout
+        self.replies.window = settings.reply_window
+        self.help_replies.ttl = settings.help_reply_ttl
+        self.parse_processes = max(1, (settings.parse_processes or os.cpu_count() or 1) // self.processes)
+        self.parallel_min_size = settings.parallel_min_size_mb * MB
+    
+    def reload_settings(self):
+        """Reload settings from the environment and config file (on SIGHUP)."""
+        try:
+            new_settings = load_settings(config_file=self.settings.config_file)
+        except ConfigError as e:
+            logger.error("Keeping current settings, reload failed: %s", e)
+            return
+        changed = new_settings.changed_fields(self.settings)
+        needs_restart = [name for name in changed if name not in RELOADABLE]
+        if needs_restart:
+            logger.warning("Settings need a restart to take effect: %s", ", ".join(needs_restart))
+            new_settings = replace(new_settings, **{name: getattr(self.settings, name) for name in needs_restart})
+        self.apply_settings(new_settings)
+        logger.info("Settings reloaded (%s)", ", ".join(changed) or "no changes")
     
     def process_request(self, client: SocketModeClient, req: SocketModeRequest):
         """Process incoming Slack events."""
+        if self.draining.is_set():
+            # Leave the event unacknowledged so Slack redelivers it to another connection
+            return
         if req.type == "events_api":
             response = SocketModeResponse(envelope_id=req.envelope_id)
             client.send_socket_mode_response(response)
@@ -38,146 +146,609 @@ class SlackCSVBot:
                     self.handle_message_without_files(event)
             elif event["type"] == "message" and "files" in event:
                 if "bot_id" not in event:
-                    self.handle_message_with_files(event)
+                    self.submit_file_job(event)
+                    # The head download can take up to download_timeout; keep it off the listener thread
+                    try:
+                        self.previews.submit(self.maybe_post_preview, event)
+                    except RuntimeError:
+                        # drain() shut the pool down after the check above; the job is answered anyway
+                        pass
+    
+    def submit_file_job(self, event):
+        """Queue a file message; the scheduler reserves its estimated memory before dispatching it."""
+        job_id = uuid.uuid4().hex[:12]
+        thread_ts = self.reply_thread(event)
+        self.scheduler.submit(
+            event["channel"],
+            event.get("user"),
+            lambda: self.handle_message_with_files(event, job_id),
+            job_id=job_id,
+            memory=self.job_memory(event),
+            on_timeout=lambda: self.send_error_message(event["channel"], BUSY_MESSAGE, **_in_thread(thread_ts)),
+            thread_ts=thread_ts,
+        )
+    
+    def job_memory(self, event):
+        """Memory to reserve for a file message before it runs."""
+        csv_files = self.select_csv_files(event.get("files", []))
+        estimate = self.estimate_job(csv_files, self.wants_stats(event))
+        # Jobs over the hard cap are rejected as soon as they start, without using the budget
+        return estimate if estimate <= self.admission.hard_cap_bytes else 0
     
     def handle_message_without_files(self, event):
         """Handle messages without file attachments."""
-        try:
-            self.client.chat_postMessage(
-                channel=event["channel"],
-                text="Please send csv file"
+        self.send_help(event)
+    
+    def send_help(self, event):
+        """Ask for a CSV file, at most once per user and channel every ``help_reply_ttl`` seconds."""
+        if self.help_replies.seen((event["channel"], event.get("user"))):
+            logger.debug(
+                "Suppressed repeated help reply", extra={"channel": event["channel"], "user": event.get("user")}
             )
-        except SlackApiError as e:
-            logger.error(f"Error sending message: {e}")
+            return
+        self.replies.send(event["channel"], HELP_MESSAGE)
+    
+    def reply_thread(self, event):
+        """Return the thread that replies about this message's files go to, if threading is on."""
+        if not self.settings.threaded_replies:
+            return None
+        return event.get("thread_ts") or event.get("ts")
     
-    def handle_message_with_files(self, event):
-        """Handle messages with file attachments."""
-        files = event.get("files", [])
+    def select_csv_files(self, files):
+        """Return the attachments that look like CSV files."""
         csv_files = []
         
         for file in files:
             if file.get("mimetype") == "text/csv" or file.get("name", "").endswith(".csv"):
                 csv_files.append(file)
         
-        if not csv_files:
+        return csv_files
+    
+    def wants_preview(self, event, csv_files):
+        """Preview when asked for in the message or when a file is large."""
+        if PREVIEW_KEYWORD in event.get("text", "").lower().split():
+            return True
+        return any(int(file.get("size") or 0) >= self.preview_min_size for file in csv_files)
+    
+    def wants_stats(self, event):
+        """Summarize instead of rewriting the file when asked for in the message."""
+        return STATS_KEYWORD in event.get("text", "").lower().split()
+    
+    def maybe_post_preview(self, event):
+        """Post the first rows inline before the full file is processed.
+        
+        No preview is posted for jobs that will be rejected for their size,
+        or while a Slack file endpoint is failing.
+        """
+        csv_files = self.select_csv_files(event.get("files", []))
+        if not csv_files or self.wants_stats(event) or not self.wants_preview(event, csv_files):
+            return
+        if self.file_service_degraded() or self.estimate_job(csv_files) > self.admission.hard_cap_bytes:
+            return
+        try:
+            transforms = parse_transforms(event.get("text", "")) or None
+        except TransformError:
+            # The full job reports the error
+            return
+        self.post_preview(event["channel"], csv_files, transforms, self.reply_thread(event))
+    
+    def post_preview(self, channel, csv_files, transforms=None, thread_ts=None):
+        """Process only the head of each file and post the result inline."""
+        previews = []
+        for file in csv_files:
             try:
-                self.client.chat_postMessage(
-                    channel=event["channel"],
-                    text="Please send csv file"
+                head = self.downloader.download_head(file, max_lines=self.preview_rows + 1)
+            except Exception as e:
+                logger.error(
+                    "Error downloading preview: %s", e,
+                    extra={"channel": channel, "file_id": file.get("id"), "file_name": file.get("name")}
                 )
-            except SlackApiError as e:
-                logger.error(f"Error sending message: {e}")
+                continue
+            preview = preview_csv(head, self.preview_rows, transforms)
+            if preview is not None:
+                previews.append(preview)
+        
+        if not previews:
             return
         
-        self.process_csv_files(event["channel"], csv_files)
+        header = f"Preview of the first {self.preview_rows} rows (full file is being processed):\n"
+        text = header + format_results_for_slack(previews, max_length=SLACK_MESSAGE_LIMIT - len(header))
+        self.post_message(channel, text, thread_ts)
     
-    def process_csv_files(self, channel, csv_files):
-        """Download and process CSV files."""
-        file_contents = []
+    def handle_message_with_files(self, event, job_id=None):
+        """Handle messages with file attachments.
         
-        for file in csv_files:
+        Memory is reserved by the scheduler before this runs; jobs over the
+        hard cap are rejected here.
+        """
+        csv_files = self.select_csv_files(event.get("files", []))
+        context = {"job_id": job_id, "channel": event["channel"], "user": event.get("user")}
+        thread_ts = self.reply_thread(event)
+        
+        if not csv_files:
+            self.send_help(event)
+            return
+        
+        if self.file_service_degraded():
+            # Fail fast instead of holding memory and a worker while downloads time out
+            logger.warning("Rejected job: Slack file service degraded", extra=context)
+            self.send_error_message(event["channel"], DEGRADED_MESSAGE, **_in_thread(thread_ts))
+            return
+        
+        stats = self.wants_stats(event)
+        transforms = None
+        if not stats:
             try:
-                response = self.client.files_info(file=file["id"])
-                file_url = response["file"]["url_private"]
-                
-                file_response = self.client.api_call(
-                    "files.info",
-                    params={"file": file["id"]},
-                    headers={"Authorization": f"Bearer {os.environ.get('SLACK_BOT_TOKEN')}"}
-                )
-                
-                import requests
-                headers = {"Authorization": f"Bearer {os.environ.get('SLACK_BOT_TOKEN')}"}
-                download_response = requests.get(file_url, headers=headers)
-                
-                if download_response.status_code == 200:
-                    file_contents.append(download_response.content)
-                else:
-                    logger.error(f"Failed to download file: {file['name']}")
-                    self.send_error_message(channel, "Failed to download CSV file")
-                    return
-                    
-            except Exception as e:
-                logger.error(f"Error downloading file {file['name']}: {e}")
-                self.send_error_message(channel, "Error downloading CSV file")
+                transforms = parse_transforms(event.get("text", "")) or None
+            except TransformError as e:
+                self.send_error_message(event["channel"], str(e), **_in_thread(thread_ts))
                 return
         
-        results = process_csv_files(file_contents)
+        estimate = self.estimate_job(csv_files, stats)
+        context["estimate_bytes"] = estimate
+        try:
+            self.admission.check(estimate, self.expansion_factor(stats))
+        except AdmissionRejected as e:
+            logger.warning("Rejected job: %s", e, extra=context)
+            self.send_error_message(event["channel"], str(e), **_in_thread(thread_ts))
+            return
+        
+        if stats:
+            self.post_stats(event["channel"], csv_files, job_id, **_in_thread(thread_ts))
+        else:
+            self.process_csv_files(event["channel"], csv_files, job_id, transforms, **_in_thread(thread_ts))
+    
+    def parallel_processes(self):
+        """Processes for a large file, capped so the ranges in flight fit the hard cap."""
+        per_range = self.admission.estimate([{"size": PARALLEL_CHUNK_BYTES}])
+        return min(self.parse_processes, self.admission.hard_cap_bytes // max(per_range, 1))
+    
+    def use_parallel(self, csv_files):
+        """Split a single large file across processes when more than one can run."""
+        return (
+            len(csv_files) == 1
+            and self.parallel_processes() > 1
+            and int(csv_files[0].get("size") or 0) >= self.parallel_min_size
+        )
+    
+    def expansion_factor(self, stats=False):
+        """Expansion factor used to estimate a job, or None for the admission default."""
+        if stats:
+            return STATS_EXPANSION_FACTOR
+        return COMPACT_EXPANSION_FACTOR if self.settings.compact_dtypes else None
+    
+    def estimate_job(self, csv_files, stats=False):
+        """Estimate the peak memory of a job for admission control."""
+        if stats:
+            # Files are summarized one at a time from disk, one chunk in memory at once
+            largest = max((int(file.get("size") or 0) for file in csv_files), default=0)
+            return self.admission.estimate([{"size": min(largest, STATS_CHUNK_BYTES)}], self.expansion_factor(stats))
+        estimate = self.admission.estimate(csv_files, self.expansion_factor())
+        if self.use_parallel(csv_files):
+            # Only the ranges currently being parsed are held in memory
+            in_flight = {"size": self.parallel_processes() * PARALLEL_CHUNK_BYTES}
+            estimate = min(estimate, self.admission.estimate([in_flight]))
+        return estimate
+    
+    def download_files(self, channel, csv_files, job_id=None, stop_on_error=False, work_dir=None):
+        """Download every file, returning the contents and a per-file error (or None).
         
-        if isinstance(results, str):
+        Failed downloads leave None in the contents. With ``stop_on_error``
+        the remaining files are not downloaded after the first failure. With
+        ``work_dir`` each file is streamed to disk there and its path is
+        returned instead of its content.
+        """
+        file_contents = []
+        download_errors = []
+        for i, file in enumerate(csv_files):
+            context = {"job_id": job_id, "channel": channel, "file_id": file.get("id"), "file_name": file.get("name")}
+            error = None
             try:
-                self.client.chat_postMessage(
-                    channel=channel,
-                    text=results
+                if work_dir is None:
+                    file_contents.append(self.downloader.download(file))
+                else:
+                    path = os.path.join(work_dir, f"{i}.csv")
+                    self.downloader.download_to_file(file, path)
+                    file_contents.append(path)
+            except CircuitOpen as e:
+                logger.warning("Skipped download: %s", e, extra=context)
+                error = DEGRADED_MESSAGE
+            except DownloadError as e:
+                logger.error("Failed to download file: %s", e, extra=context)
+                error = "Failed to download CSV file"
+            except Exception as e:
+                logger.error("Error downloading file: %s", e, extra=context)
+                error = "Error downloading CSV file"
+            if error is not None:
+                file_contents.append(None)
+            else:
+                size = len(file_contents[-1]) if work_dir is None else os.path.getsize(file_contents[-1])
+                logger.info(
+                    "Downloaded file (%d bytes)", size,
+                    extra={**context, "size_bytes": size, "sample_every": FILE_LOG_SAMPLE_EVERY}
                 )
-            except SlackApiError as e:
-                logger.error(f"Error sending message: {e}")
+            download_errors.append(error)
+            if error is not None and stop_on_error:
+                break
+        return file_contents, download_errors
+    
+    def process_csv_files(self, channel, csv_files, job_id=None, transforms=None, thread_ts=None):
+        """Download and process CSV files, replying in ``thread_ts`` if given."""
+        if self.use_parallel(csv_files):
+            self.process_large_file(channel, csv_files[0], job_id, transforms, thread_ts)
+            return
+        
+        timings = {}
+        tolerant = self.settings.tolerant_parsing
+        
+        started = time.perf_counter()
+        file_contents, download_errors = self.download_files(channel, csv_files, job_id, stop_on_error=not tolerant)
+        if not tolerant and any(download_errors):
+            self.send_error_message(channel, download_errors[-1], **_in_thread(thread_ts))
+            return
+        timings["download"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        if tolerant:
+            processed = iter(process_csv_files_tolerant(
+                [content for content in file_contents if content is not None],
+                transforms,
+                compact=self.settings.compact_dtypes
+            ))
+            results = [FileResult(error=error) if error else next(processed) for error in download_errors]
         else:
-            self.upload_processed_files(channel, results, csv_files)
+            results = process_csv_files(file_contents, transforms, compact=self.settings.compact_dtypes)
+        timings["process"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        description = describe_transforms(transforms) if transforms else None
+        if tolerant:
+            self.reply_with_file_results(channel, results, csv_files, description, **_in_thread(thread_ts))
+        elif isinstance(results, str):
+            self.send_error_message(channel, results, **_in_thread(thread_ts))
+        else:
+            self.upload_processed_files(channel, results, csv_files, description, **_in_thread(thread_ts))
+        timings["reply"] = time.perf_counter() - started
+        
+        logger.info(
+            "Job finished: %d files in %.3fs", len(csv_files), sum(timings.values()),
+            extra={
+                "job_id": job_id,
+                "channel": channel,
+                "size_bytes": sum(len(content) for content in file_contents if content is not None),
+                "timings_ms": {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()},
+            }
+        )
     
-    def upload_processed_files(self, channel, results, original_files):
-        """Upload processed CSV files to Slack."""
+    def process_large_file(self, channel, file, job_id=None, transforms=None, thread_ts=None):
+        """Process one large file on several cores, going through temporary files.
+        
+        The download is streamed to disk and the result uploaded from disk,
+        so neither is held in memory.
+        """
+        timings = {}
+        context = {"job_id": job_id, "channel": channel, "file_id": file.get("id"), "file_name": file.get("name")}
+        with tempfile.TemporaryDirectory(prefix="slackbot-") as work_dir:
+            input_path = os.path.join(work_dir, "input.csv")
+            output_path = os.path.join(work_dir, "output.csv")
+            
+            started = time.perf_counter()
+            try:
+                size = self.downloader.download_to_file(file, input_path)
+            except CircuitOpen as e:
+                logger.warning("Skipped download: %s", e, extra=context)
+                self.send_error_message(channel, DEGRADED_MESSAGE, **_in_thread(thread_ts))
+                return
+            except DownloadError as e:
+                logger.error("Failed to download file: %s", e, extra=context)
+                self.send_error_message(channel, "Failed to download CSV file", **_in_thread(thread_ts))
+                return
+            except Exception as e:
+                logger.error("Error downloading file: %s", e, extra=context)
+                self.send_error_message(channel, "Error downloading CSV file", **_in_thread(thread_ts))
+                return
+            timings["download"] = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            result = process_csv_file_parallel(
+                input_path,
+                output_path,
+                transforms,
+                processes=self.parallel_processes(),
+                tolerant=self.settings.tolerant_parsing,
+                compact=self.settings.compact_dtypes,
+            )
+            timings["process"] = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            if result.ok:
+                description = describe_transforms(transforms) if transforms else None
+                self.upload_processed_path(channel, output_path, file, description, thread_ts)
+                if result.quarantine:
+                    self.upload_quarantine_file(channel, result, file, thread_ts)
+            else:
+                self.send_error_message(channel, result.error, **_in_thread(thread_ts))
+            timings["reply"] = time.perf_counter() - started
+        
+        logger.info(
+            "Job finished: 1 file in %.3fs", sum(timings.values()),
+            extra={
+                **context,
+                "size_bytes": size,
+                "timings_ms": {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()},
+            }
+        )
+    
+    def post_stats(self, channel, csv_files, job_id=None, thread_ts=None):
+        """Post per-column count/min/max/mean/sum inline instead of uploading files.
+        
+        Files are streamed to disk and read back in chunks, so memory does not
+        grow with the file size.
+        """
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="slackbot-") as work_dir:
+            paths, download_errors = self.download_files(channel, csv_files, job_id, work_dir=work_dir)
+            summarized = iter(summarize_csv_files([path for path in paths if path is not None]))
+            results = [FileResult(error=error) if error else next(summarized) for error in download_errors]
+            size = sum(os.path.getsize(path) for path in paths if path is not None)
+        
+        succeeded = [(result, file) for result, file in zip(results, csv_files) if result.ok]
+        failed = [(result, file) for result, file in zip(results, csv_files) if not result.ok]
+        if succeeded:
+            names = ", ".join(file["name"] for _, file in succeeded)
+            header = f"Column stats for {names}:\n"
+            tables = [result.content for result, _ in succeeded]
+            text = header + format_results_for_slack(tables, max_length=SLACK_MESSAGE_LIMIT - len(header))
+            self.post_message(channel, text, thread_ts)
+        if failed:
+            self.report_failed_files(channel, failed, len(csv_files), thread_ts)
+        
+        logger.info(
+            "Stats finished: %d files in %.3fs", len(csv_files), time.perf_counter() - started,
+            extra={"job_id": job_id, "channel": channel, "size_bytes": size}
+        )
+    
+    def reply_with_file_results(self, channel, results, original_files, description=None, thread_ts=None):
+        """Upload the files that succeeded, their quarantined rows, and report the failures."""
+        succeeded = [(result, file) for result, file in zip(results, original_files) if result.ok]
+        failed = [(result, file) for result, file in zip(results, original_files) if not result.ok]
+        
+        if succeeded:
+            self.upload_processed_files(
+                channel,
+                [result.content for result, _ in succeeded],
+                [file for _, file in succeeded],
+                description,
+                **_in_thread(thread_ts)
+            )
+            for result, file in succeeded:
+                if result.quarantine:
+                    self.upload_quarantine_file(channel, result, file, thread_ts)
+        
+        if failed:
+            self.report_failed_files(channel, failed, len(original_files), thread_ts)
+    
+    def report_failed_files(self, channel, failed, total_files, thread_ts=None):
+        """Send one message listing the files that could not be processed."""
+        if total_files == 1:
+            text = failed[0][0].error
+        else:
+            text = "\n".join(f"{file['name']}: {result.error}" for result, file in failed)
+        self.send_error_message(channel, text, **_in_thread(thread_ts))
+    
+    def upload_file(self, thread_ts=None, **kwargs):
+        """Upload a file through the upload circuit breaker, into ``thread_ts`` if given."""
+        with self.upload_breaker.guard():
+            return self.client.files_upload_v2(**kwargs, **_in_thread(thread_ts))
+    
+    def upload_quarantine_file(self, channel, result, original_file, thread_ts=None):
+        """Upload the malformed rows that were skipped while processing a file."""
+        try:
+            self.upload_file(
+                channel=channel,
+                content=result.quarantine,
+                filename=f"quarantine_{original_file['name']}",
+                title=f"Skipped rows from {original_file['name']}",
+                initial_comment=f"⚠️ Skipped {result.bad_rows} malformed rows in {original_file['name']}",
+                thread_ts=thread_ts
+            )
+        except (SlackApiError, CircuitOpen) as e:
+            logger.error("Error uploading quarantine file: %s", e, extra={"channel": channel})
+    
+    def upload_processed_files(self, channel, results, original_files, description=None, thread_ts=None):
+        """Upload processed CSV files to Slack.
+        
+        ``description`` summarizes custom transforms; without it the messages
+        describe the default doubling. With ``thread_ts`` the files and the
+        summary are posted as replies in that thread.
+        """
+        if description:
+            summary = f"✅ Successfully processed {len(results)} CSV files! Applied: {description}."
+        else:
+            summary = f"✅ Successfully processed {len(results)} CSV files! Integer columns have been doubled."
         try:
             if len(results) == 1:
                 # Single file
                 filename = f"processed_{original_files[0]['name']}"
-                self.client.files_upload_v2(
+                self.upload_file(
                     channel=channel,
                     content=results[0],
                     filename=filename,
                     title=f"Processed {original_files[0]['name']}",
-                    initial_comment="CSV file processed - integer columns have been doubled! 📊"
+                    initial_comment=_processed_comment(description),
+                    thread_ts=thread_ts
                 )
             else:
                 # Multiple files
                 for i, (result, original_file) in enumerate(zip(results, original_files)):
                     filename = f"processed_{original_file['name']}"
                     comment = f"Processed file {i+1}/{len(results)}: {original_file['name']}" if i == 0 else None
-                    self.client.files_upload_v2(
+                    self.upload_file(
                         channel=channel,
                         content=result,
                         filename=filename,
                         title=f"Processed {original_file['name']}",
-                        initial_comment=comment
+                        initial_comment=comment,
+                        thread_ts=thread_ts
                     )
                 
                 # Send summary message
                 self.client.chat_postMessage(
                     channel=channel,
-                    text=f"✅ Successfully processed {len(results)} CSV files! Integer columns have been doubled."
+                    text=summary,
+                    **_in_thread(thread_ts)
                 )
                 
+        except CircuitOpen as e:
+            logger.warning("Skipped upload: %s", e, extra={"channel": channel})
+            self.send_error_message(channel, DEGRADED_MESSAGE, **_in_thread(thread_ts))
         except SlackApiError as e:
-            logger.error(f"Error uploading files: {e}")
-            self.send_error_message(channel, "Error uploading processed CSV files")
+            logger.error("Error uploading files: %s", e, extra={"channel": channel})
+            self.send_error_message(channel, "Error uploading processed CSV files", **_in_thread(thread_ts))
     
-    def send_error_message(self, channel, message):
-        """Send error message to channel."""
+    def upload_processed_path(self, channel, path, original_file, description=None, thread_ts=None):
+        """Upload a processed CSV file from disk."""
         try:
-            self.client.chat_postMessage(
+            self.upload_file(
                 channel=channel,
-                text=message
+                file=path,
+                filename=f"processed_{original_file['name']}",
+                title=f"Processed {original_file['name']}",
+                initial_comment=_processed_comment(description),
+                thread_ts=thread_ts
             )
+        except CircuitOpen as e:
+            logger.warning("Skipped upload: %s", e, extra={"channel": channel})
+            self.send_error_message(channel, DEGRADED_MESSAGE, **_in_thread(thread_ts))
+        except SlackApiError as e:
+            logger.error("Error uploading files: %s", e, extra={"channel": channel})
+            self.send_error_message(channel, "Error uploading processed CSV files", **_in_thread(thread_ts))
+    
+    def send_error_message(self, channel, message, thread_ts=None):
+        """Send error message to channel, merged with other replies sent within the reply window."""
+        self.replies.send(channel, message, thread_ts)
+    
+    def post_message(self, channel, text, thread_ts=None):
+        """Post a message right away, as a thread reply if ``thread_ts`` is given."""
+        try:
+            self.client.chat_postMessage(channel=channel, text=text, **_in_thread(thread_ts))
         except SlackApiError as e:
-            logger.error(f"Error sending error message: {e}")
+            logger.error("Error sending message: %s", e, extra={"channel": channel})
+    
+    def drain_status(self):
+        """Report shutdown progress for orchestrators."""
+        if self.draining.is_set():
+            state = "draining"
+        else:
+            state = "running" if self.running else "stopped"
+        remaining = None
+        if self._drain_deadline is not None:
+            remaining = max(0.0, self._drain_deadline - time.monotonic())
+        return {
+            "state": state,
+            "in_flight": len(self.scheduler.in_flight()),
+            "queued": self.scheduler.queue_depth(),
+            "deadline_remaining": remaining,
+        }
+    
+    def file_service_degraded(self):
+        """Return True while a Slack file endpoint breaker is open."""
+        return any(breaker.state == OPEN for breaker in self.breakers.values())
+    
+    def metrics(self):
+        """Return a snapshot of scheduler, memory, breaker and drain state."""
+        return {
+            "channels": self.scheduler.metrics(),
+            "memory": self.admission.stats(),
+            "breakers": {name: breaker.snapshot() for name, breaker in self.breakers.items()},
+            "drain": self.drain_status(),
+        }
+    
+    def health(self):
+        """Readiness report served on /readyz.
+        
+        The bot is ready while it is connected and not draining; an open
+        breaker is reported as ``degraded`` but jobs are still accepted and
+        answered.
+        """
+        in_flight = len(self.scheduler.in_flight())
+        return {
+            "ready": self.running and not self.draining.is_set(),
+            "degraded": self.file_service_degraded(),
+            "breakers": {name: breaker.snapshot() for name, breaker in self.breakers.items()},
+            "queue_depth": self.scheduler.queue_depth(),
+            "in_flight": in_flight,
+            "workers": self.scheduler.workers,
+            "saturation": round(in_flight / self.scheduler.workers, 3),
+            "memory": self.admission.stats(),
+            "channels": self.scheduler.metrics(),
+            "drain": self.drain_status(),
+        }
+    
+    def start_health_server(self):
+        """Serve /healthz and /readyz if a health port is configured."""
+        if not self.settings.health_port:
+            return
+        try:
+            self.health_server = HealthServer((self.settings.health_host, self.settings.health_port), self.health)
+        except OSError as e:
+            logger.error("Cannot start health endpoint on port %d: %s", self.settings.health_port, e)
+            return
+        self.health_server.start()
+    
+    def drain(self, timeout=None):
+        """Stop accepting events and let in-flight jobs finish before shutdown.
+        
+        Jobs that never started, or are still running when the deadline
+        passes, are answered with a retry message.
+        """
+        timeout = self.drain_timeout if timeout is None else timeout
+        self.draining.set()
+        self._drain_deadline = time.monotonic() + timeout
+        if self.socket_client:
+            self.socket_client.disconnect()
+        
+        self.previews.shutdown(wait=False, cancel_futures=True)
+        pending = self.scheduler.cancel_pending()
+        logger.info("Draining: %d queued jobs cancelled, waiting up to %.0fs for in-flight jobs", len(pending), timeout)
+        for job in pending:
+            self.send_error_message(job.channel, RETRY_MESSAGE, **_in_thread(job.thread_ts))
+        
+        while True:
+            remaining = self._drain_deadline - time.monotonic()
+            if self.scheduler.wait_idle(timeout=max(0.0, min(1.0, remaining))) or remaining <= 0:
+                break
+            logger.info("Draining: %d jobs still in flight, %.0fs left", len(self.scheduler.in_flight()), remaining)
+        
+        unfinished = self.scheduler.in_flight()
+        for job in unfinished:
+            self.send_error_message(job.channel, RETRY_MESSAGE, **_in_thread(job.thread_ts))
+        self.scheduler.stop(timeout=0)
+        self.replies.flush()
+        logger.info("Drain complete (%d jobs did not finish before the deadline)", len(unfinished))
     
     def start(self):
-        """Start the bot and keep it running until Ctrl+C."""
+        """Start the bot and keep it running until Ctrl+C or SIGTERM."""
         def signal_handler(signum, frame):
             logger.info("Received interrupt signal. Shutting down gracefully...")
             self.running = False
-            if self.socket_client:
-                self.socket_client.disconnect()
-            sys.exit(0)
+        
+        def reload_handler(signum, frame):
+            # Reload off the signal handler so it never contends for locks held by this thread
+            threading.Thread(target=self.reload_settings, name="settings-reload", daemon=True).start()
         
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, reload_handler)
         
         try:
             logger.info("Starting Slack CSV Bot...")
             logger.info("Bot is ready to process CSV files. Press Ctrl+C to stop.")
             self.running = True
+            self.scheduler.start()
+            self.start_health_server()
             
             # Start the socket mode connection
             self.socket_client.connect()
@@ -188,20 +759,24 @@ class SlackCSVBot:
                     signal.pause()  # Wait for signals
                 except AttributeError:
                     # signal.pause() is not available on Windows
-                    import time
                     while self.running:
                         time.sleep(1)
                         
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received. Shutting down...")
         except Exception as e:
-            logger.error(f"Unexpected error: {e}")
+            logger.exception("Unexpected error: %s", e)
         finally:
-            if self.socket_client:
-                self.socket_client.disconnect()
+            self.running = False
+            self.drain()
+            if self.health_server is not None:
+                self.health_server.stop()
+                self.health_server = None
             logger.info("Bot stopped.")
 
 
 if __name__ == "__main__":
-    bot = SlackCSVBot()
+    settings = load_settings()
+    configure_logging(settings.log_level, settings.log_format)
+    bot = SlackCSVBot(settings)
     bot.start()
\ No newline at end of file
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for a while instead of waiting on it.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail immediately with CircuitOpen. Once ``reset_timeout`` seconds
+    have passed a single trial call is let through: success closes the
+    breaker, failure opens it again. ``is_failure`` decides which exceptions
+    count; errors caused by the request itself (e.g. a missing file) should
+    not open the breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        is_failure: Callable[[BaseException], bool] = lambda error: True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _acquire(self) -> bool:
+        """Return True if the call is the half-open trial."""
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            if self._trial_running or self.clock() - self._opened_at < self.reset_timeout:
+                raise CircuitOpen(f"{self.name} is unavailable")
+            self._state = HALF_OPEN
+            self._trial_running = True
+            return True
+
+    def _record(self, trial: bool, failed: bool) -> None:
+        with self._lock:
+            if trial:
+                self._trial_running = False
+            if not failed:
+                if self._state != CLOSED:
+                    logger.info("Circuit %s closed", self.name)
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if trial or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                if self._state != OPEN:
+                    logger.warning("Circuit %s opened after %d failures", self.name, self._failures)
+                self._state = OPEN
+                self._opened_at = self.clock()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Run the block as one call to the dependency.
+
+        Raises CircuitOpen without running the block while the breaker is open.
+        """
+        trial = self._acquire()
+        try:
+            yield
+        except BaseException as e:
+            self._record(trial, failed=self.is_failure(e))
+            raise
+        self._record(trial, failed=False)
+
+    def snapshot(self) -> Dict:
+        """Return the state for health reports."""
+        state = self.state
+        with self._lock:
+            return {"state": state, "failures": self._failures}
@@ -0,0 +1,202 @@
+import os
+import tomllib
+from dataclasses import dataclass, field, fields, replace
+from typing import Dict, List, Mapping, Optional
+
+from dotenv import dotenv_values, find_dotenv
+
+CONFIG_FILE_ENV = "CSV_BOT_CONFIG"
+ENV_PREFIX = "CSV_BOT_"
+
+# Settings that can change on SIGHUP without restarting the bot
+RELOADABLE = (
+    "memory_budget_mb",
+    "max_job_memory_mb",
+    "admission_timeout",
+    "workers",
+    "channel_concurrency",
+    "priority_channels",
+    "drain_timeout",
+    "preview_rows",
+    "preview_min_size_mb",
+    "download_timeout",
+    "tolerant_parsing",
+    "parse_processes",
+    "parallel_min_size_mb",
+    "slack_api_timeout",
+    "breaker_failures",
+    "breaker_reset_timeout",
+    "reply_window",
+    "help_reply_ttl",
+    "threaded_replies",
+    "compact_dtypes",
+)
+
+
+class ConfigError(ValueError):
+    """Raised when settings are missing or invalid."""
+
+
+def parse_priority_channels(value: str) -> Dict[str, int]:
+    """Parse a "C123:3,C456:2" list of channel weights."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        channel, _, weight = item.partition(":")
+        weights[channel] = int(weight or 2)
+    return weights
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Bot configuration, loaded once at startup.
+
+    Values come from, in increasing order of precedence: the defaults below,
+    an optional TOML file, a .env file and the process environment. Tokens
+    are read from SLACK_BOT_TOKEN / SLACK_APP_TOKEN, every other setting from
+    CSV_BOT_<NAME>, e.g. CSV_BOT_WORKERS.
+    """
+    slack_bot_token: Optional[str] = None
+    slack_app_token: Optional[str] = None
+    memory_budget_mb: int = 2048
+    max_job_memory_mb: int = 1024
+    admission_timeout: float = 600.0
+    workers: int = 8
+    channel_concurrency: int = 2
+    priority_channels: Dict[str, int] = field(default_factory=dict)
+    drain_timeout: float = 25.0
+    preview_rows: int = 20
+    preview_min_size_mb: int = 50
+    download_timeout: float = 60.0
+    tolerant_parsing: bool = True
+    parse_processes: int = 0
+    parallel_min_size_mb: int = 256
+    slack_api_timeout: float = 30.0
+    breaker_failures: int = 5
+    breaker_reset_timeout: float = 30.0
+    health_host: str = "127.0.0.1"
+    health_port: int = 0
+    reply_window: float = 1.0
+    help_reply_ttl: float = 300.0
+    threaded_replies: bool = True
+    compact_dtypes: bool = False
+    log_level: str = "INFO"
+    log_format: str = "json"
+    config_file: Optional[str] = None
+
+    def validate(self) -> "Settings":
+        """Check value ranges, raising ConfigError listing every problem."""
+        problems: List[str] = []
+        at_least_one = (
+            "memory_budget_mb", "max_job_memory_mb", "workers", "channel_concurrency", "preview_rows",
+            "breaker_failures",
+        )
+        positive = (
+            "admission_timeout", "drain_timeout", "download_timeout", "slack_api_timeout", "breaker_reset_timeout",
+        )
+        for name in at_least_one:
+            if getattr(self, name) < 1:
+                problems.append(f"{name} must be at least 1")
+        for name in positive:
+            if getattr(self, name) <= 0:
+                problems.append(f"{name} must be positive")
+        non_negative = (
+            "preview_min_size_mb", "parse_processes", "parallel_min_size_mb", "health_port", "reply_window",
+            "help_reply_ttl",
+        )
+        for name in non_negative:
+            if getattr(self, name) < 0:
+                problems.append(f"{name} must not be negative")
+        if any(weight < 1 for weight in self.priority_channels.values()):
+            problems.append("priority channel weights must be at least 1")
+        if self.log_level.upper() not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+            problems.append(f"unknown log_level {self.log_level!r}")
+        if self.log_format not in ("json", "text"):
+            problems.append(f"log_format must be 'json' or 'text', not {self.log_format!r}")
+        if problems:
+            raise ConfigError("Invalid settings: " + "; ".join(problems))
+        return self
+
+    def require_tokens(self) -> "Settings":
+        """Check that both Slack tokens are set, raising ConfigError naming the missing ones."""
+        missing = [env_name(name) for name in ("slack_bot_token", "slack_app_token") if not getattr(self, name)]
+        if missing:
+            raise ConfigError("Missing required settings: " + ", ".join(missing))
+        return self
+
+    def changed_fields(self, other: "Settings") -> List[str]:
+        """Return the names of settings that differ from ``other``."""
+        return [f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)]
+
+
+def env_name(name: str) -> str:
+    """Return the environment variable that sets a field."""
+    if name.startswith("slack_"):
+        return name.upper()
+    return ENV_PREFIX + name.upper()
+
+
+def _convert(name: str, value, default):
+    """Convert a raw TOML or environment value to the type of the default."""
+    try:
+        if name == "priority_channels":
+            if isinstance(value, str):
+                return parse_priority_channels(value)
+            return {str(channel): int(weight) for channel, weight in dict(value).items()}
+        if isinstance(default, bool):
+            if isinstance(value, bool):
+                return value
+            if str(value).lower() in ("1", "true", "yes", "on"):
+                return True
+            if str(value).lower() in ("0", "false", "no", "off"):
+                return False
+            raise ValueError("expected true or false")
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError) as e:
+        raise ConfigError(f"Invalid value for {name}: {value!r} ({e})") from e
+
+
+def load_settings(
+    config_file: Optional[str] = None,
+    env_file: Optional[str] = ".env",
+    environ: Optional[Mapping[str, str]] = None,
+) -> Settings:
+    """Load and validate settings without modifying the process environment.
+
+    Like load_dotenv(), an ``env_file`` that is not in the current directory
+    is looked up in its parents.
+    """
+    environ = os.environ if environ is None else environ
+    env = {}
+    if env_file and not os.path.exists(env_file):
+        env_file = find_dotenv(env_file, usecwd=True)
+    if env_file:
+        env.update({key: value for key, value in dotenv_values(env_file).items() if value is not None})
+    env.update(environ)
+
+    config_file = config_file or env.get(CONFIG_FILE_ENV)
+    file_values = {}
+    if config_file:
+        try:
+            with open(config_file, "rb") as f:
+                file_values = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            raise ConfigError(f"Cannot read config file {config_file}: {e}") from e
+
+    defaults = Settings()
+    known = {f.name for f in fields(Settings)} - {"config_file"}
+    unknown = set(file_values) - known
+    if unknown:
+        raise ConfigError(f"Unknown settings in {config_file}: {', '.join(sorted(unknown))}")
+
+    values = {}
+    for name in known:
+        default = getattr(defaults, name)
+        if env_name(name) in env:
+            values[name] = _convert(name, env[env_name(name)], default)
+        elif name in file_values:
+            values[name] = _convert(name, file_values[name], default)
+    return replace(defaults, config_file=config_file, **values).validate()
@@ -1,6 +1,15 @@
 import pandas as pd
+import csv
 import io
-from typing import List, Union
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+from .dtypes import read_csv_compact
+from .stats import chunk_rows, compute_stats, format_stats
+from .transforms import Transform, apply_transforms
+
+TRUNCATION_NOTE = "... (truncated)"
 
 
 def validate_csv_format(file_content: bytes) -> bool:
@@ -36,8 +45,80 @@ def check_comma_separation(file_content: bytes) -> bool:
         return False
 
 
-def process_csv_files(file_contents: List[bytes]) -> Union[str, List[str]]:
-    """Process multiple CSV files and double integer values."""
+def _transform_to_csv(df: pd.DataFrame, transforms: Optional[List[Transform]] = None) -> str:
+    """Apply the transforms (default: double integer columns) and serialize back to CSV."""
+    apply_transforms(df, transforms)
+    
+    output = io.StringIO()
+    df.to_csv(output, index=False)
+    return output.getvalue()
+
+
+def _head(file_content: bytes, lines: int = 5) -> bytes:
+    """Return the first ``lines`` lines, which is all check_comma_separation looks at."""
+    end = -1
+    for _ in range(lines):
+        end = file_content.find(b'\n', end + 1)
+        if end == -1:
+            return file_content
+    return file_content[:end]
+
+
+def _is_blank(file_content: bytes) -> bool:
+    return not file_content or file_content.isspace()
+
+
+def _read_compact_frame(file_content: bytes) -> Optional[pd.DataFrame]:
+    """Parse a file in compact mode, or return None where validate_csv_format would reject it."""
+    if _is_blank(file_content):
+        return None
+    try:
+        df = read_csv_compact(file_content)
+    except Exception:
+        return None
+    if len(df.columns) == 0 or all(str(col).startswith('Unnamed:') for col in df.columns):
+        return None
+    return df
+
+
+def _process_csv_files_compact(
+    file_contents: List[bytes],
+    transforms: Optional[List[Transform]] = None,
+) -> Union[str, List[str]]:
+    """Compact-mode process_csv_files: the parse that validates a file is also the one processed."""
+    frames = []
+    for file_content in file_contents:
+        df = _read_compact_frame(file_content)
+        if df is None:
+            return "Please send csv file"
+        if not check_comma_separation(_head(file_content)):
+            return "Please send csv file with comma(,)."
+        frames.append(df)
+    
+    results = []
+    for i in range(len(frames)):
+        df, frames[i] = frames[i], None
+        try:
+            results.append(_transform_to_csv(df, transforms))
+        except Exception as e:
+            return f"Error processing file {i+1}: {str(e)}"
+    
+    return results
+
+
+def process_csv_files(
+    file_contents: List[bytes],
+    transforms: Optional[List[Transform]] = None,
+    compact: bool = False,
+) -> Union[str, List[str]]:
+    """Process multiple CSV files and double integer values (or apply ``transforms``).
+    
+    ``compact`` parses with categorical/Arrow strings and downcast integers
+    to use less memory; the output is the same.
+    """
+    if compact:
+        return _process_csv_files_compact(file_contents, transforms)
+    
     results = []
     
     for i, file_content in enumerate(file_contents):
@@ -51,14 +132,7 @@ def process_csv_files(file_contents: List[bytes]) -> Union[str, List[str]]:
         try:
             content_str = file_content.decode('utf-8')
             df = pd.read_csv(io.StringIO(content_str))
-            
-            for col in df.columns:
-                if df[col].dtype in ['int64', 'int32', 'int16', 'int8']:
-                    df[col] = df[col] * 2
-            
-            output = io.StringIO()
-            df.to_csv(output, index=False)
-            results.append(output.getvalue())
+            results.append(_transform_to_csv(df, transforms))
             
         except Exception as e:
             return f"Error processing file {i+1}: {str(e)}"
@@ -66,8 +140,175 @@ def process_csv_files(file_contents: List[bytes]) -> Union[str, List[str]]:
     return results
 
 
-def format_results_for_slack(results: List[str]) -> str:
-    """Format processed CSV results for Slack message."""
+def preview_csv(
+    file_content: bytes,
+    nrows: int,
+    transforms: Optional[List[Transform]] = None,
+) -> Optional[str]:
+    """Process only the first ``nrows`` rows of a CSV file.
+    
+    Returns None if the content is not a valid comma-separated CSV.
+    """
+    if not validate_csv_format(file_content) or not check_comma_separation(file_content):
+        return None
+    try:
+        df = pd.read_csv(io.BytesIO(file_content), nrows=nrows)
+        return _transform_to_csv(df, transforms)
+    except Exception:
+        return None
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text at a line boundary so it fits in ``limit`` characters."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind('\n', 0, max(0, limit - len(TRUNCATION_NOTE) - 1))
+    return text[:max(cut, 0)] + '\n' + TRUNCATION_NOTE
+
+
+@dataclass
+class FileResult:
+    """Outcome of processing one file in tolerant mode."""
+    content: Optional[str] = None
+    error: Optional[str] = None
+    quarantine: Optional[str] = None
+    bad_rows: int = 0
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _quarantine_rows(content_str: str, n_fields: int) -> Tuple[str, int]:
+    """Collect rows with more fields than the header into a CSV.
+    
+    These are the rows pandas drops with ``on_bad_lines="skip"``. Each row is
+    prefixed with its line number in the original file.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    reader = csv.reader(io.StringIO(content_str))
+    header = next(reader, [])
+    writer.writerow(['line'] + header)
+    count = 0
+    for row in reader:
+        if len(row) > n_fields:
+            writer.writerow([reader.line_num] + row)
+            count += 1
+    return output.getvalue(), count
+
+
+def _process_one_tolerant(
+    file_content: bytes,
+    index: int,
+    transforms: Optional[List[Transform]] = None,
+    compact: bool = False,
+) -> FileResult:
+    """Process a single file, skipping malformed rows instead of failing."""
+    if compact:
+        # The bytes are parsed directly; a decoded copy is only made to quarantine rows
+        content_str = None
+        if _is_blank(file_content):
+            return FileResult(error="Please send csv file")
+    else:
+        try:
+            content_str = file_content.decode('utf-8')
+        except UnicodeDecodeError:
+            return FileResult(error="Please send csv file")
+        if not content_str.strip():
+            return FileResult(error="Please send csv file")
+    
+    def parse(**read_kwargs):
+        if compact:
+            return read_csv_compact(file_content, **read_kwargs)
+        return pd.read_csv(io.StringIO(content_str), **read_kwargs)
+    
+    try:
+        quarantine, bad_rows = None, 0
+        try:
+            # Clean files take the fast path: a single strict parse
+            df = parse()
+        except pd.errors.ParserError:
+            df = parse(on_bad_lines='skip')
+            text = content_str if content_str is not None else file_content.decode('utf-8')
+            quarantine, bad_rows = _quarantine_rows(text, len(df.columns))
+    except Exception:
+        return FileResult(error="Please send csv file")
+    
+    if len(df.columns) == 0 or all(str(col).startswith('Unnamed:') for col in df.columns):
+        return FileResult(error="Please send csv file")
+    if not check_comma_separation(_head(file_content) if compact else file_content):
+        return FileResult(error="Please send csv file with comma(,).")
+    
+    try:
+        return FileResult(content=_transform_to_csv(df, transforms), quarantine=quarantine, bad_rows=bad_rows)
+    except Exception as e:
+        return FileResult(error=f"Error processing file {index + 1}: {str(e)}")
+
+
+def process_csv_files_tolerant(
+    file_contents: List[bytes],
+    transforms: Optional[List[Transform]] = None,
+    compact: bool = False,
+) -> List[FileResult]:
+    """Process each file independently, quarantining malformed rows.
+    
+    Unlike process_csv_files, a bad file does not discard the others and a
+    row with too many fields is skipped and returned in ``quarantine``
+    instead of failing the whole file.
+    """
+    return [
+        _process_one_tolerant(file_content, i, transforms, compact)
+        for i, file_content in enumerate(file_contents)
+    ]
+
+
+# Bytes read from the start of a file on disk to validate it and size its chunks
+SUMMARY_HEAD_BYTES = 64 * 1024
+
+
+def _summarize_one(source: Union[bytes, str]) -> FileResult:
+    """Compute the stats table for one file (its bytes or a path), or the reason it is not a CSV."""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            head = f.read(SUMMARY_HEAD_BYTES)
+        blank = _is_blank(head) and os.path.getsize(source) <= len(head)
+    else:
+        head, blank = source[:SUMMARY_HEAD_BYTES], _is_blank(source)
+    if blank:
+        return FileResult(error="Please send csv file")
+    try:
+        stats = compute_stats(source, chunksize=chunk_rows(head))
+    except Exception:
+        return FileResult(error="Please send csv file")
+    if not stats or all(str(column).startswith('Unnamed:') for column in stats):
+        return FileResult(error="Please send csv file")
+    if not check_comma_separation(_head(head)):
+        return FileResult(error="Please send csv file with comma(,).")
+    return FileResult(content=format_stats(stats))
+
+
+def summarize_csv_files(sources: List[Union[bytes, str]]) -> List[FileResult]:
+    """Compute per-column count/min/max/mean/sum for each file, given as bytes or a path.
+    
+    Files are parsed in chunks of about STATS_CHUNK_BYTES, so memory grows
+    with the number of columns rather than rows, and nothing is serialized
+    back to CSV. Pass paths to keep large files out of memory entirely.
+    """
+    return [_summarize_one(source) for source in sources]
+
+
+def format_results_for_slack(results: List[str], max_length: Optional[int] = None) -> str:
+    """Format processed CSV results for Slack message.
+    
+    When ``max_length`` is given, each result is truncated at a line boundary
+    so the whole message fits.
+    """
+    if max_length is not None:
+        overhead = len(format_results_for_slack([''] * len(results)))
+        per_result = max(0, (max_length - overhead) // len(results))
+        results = [_truncate(result, per_result) for result in results]
+    
     if len(results) == 1:
         return f"```\n{results[0]}\n```"
     
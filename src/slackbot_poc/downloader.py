@@ -0,0 +1,121 @@
+import requests
+from typing import Dict, Optional
+from urllib.error import URLError
+
+from slack_sdk.errors import SlackApiError
+
+from .circuit import CircuitBreaker
+
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadError(Exception):
+    """Raised when a Slack file cannot be downloaded."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _is_server_status(status_code: Optional[int]) -> bool:
+    return status_code is None or status_code >= 500 or status_code == 429
+
+
+def is_service_failure(error: BaseException) -> bool:
+    """Tell outages of the Slack file service apart from problems with the request itself.
+
+    Timeouts, connection errors, 5xx and rate limiting count as failures;
+    e.g. a 404 or a ``channel_not_found`` API error does not.
+    """
+    if isinstance(error, DownloadError):
+        return _is_server_status(error.status_code)
+    if isinstance(error, SlackApiError):
+        return _is_server_status(getattr(error.response, "status_code", None))
+    return isinstance(error, (requests.RequestException, URLError, TimeoutError, ConnectionError))
+
+
+class SlackFileDownloader:
+    """Download private Slack files over a pooled HTTP session.
+
+    Every download goes through ``breaker``, so once the file service keeps
+    failing, downloads fail immediately with CircuitOpen instead of each
+    waiting for its own timeout.
+    """
+
+    def __init__(
+        self,
+        client,
+        token: Optional[str],
+        timeout: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.client = client
+        self.token = token
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.breaker = breaker or CircuitBreaker("files.download", is_failure=is_service_failure)
+
+    def file_url(self, file: Dict) -> str:
+        """Return the private download URL of a file, looking it up if the event lacks it."""
+        if file.get("url_private"):
+            return file["url_private"]
+        response = self.client.files_info(file=file["id"])
+        return response["file"]["url_private"]
+
+    def _get(self, file: Dict, stream: bool = False) -> requests.Response:
+        response = self.session.get(
+            self.file_url(file),
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=self.timeout,
+            stream=stream,
+        )
+        if response.status_code != 200:
+            response.close()
+            raise DownloadError(
+                f"Failed to download {file.get('name')}: HTTP {response.status_code}",
+                status_code=response.status_code,
+            )
+        return response
+
+    def download(self, file: Dict) -> bytes:
+        """Download the whole file."""
+        with self.breaker.guard():
+            return self._get(file).content
+
+    def download_to_file(self, file: Dict, path: str) -> int:
+        """Stream the file to ``path`` without holding it in memory; return its size."""
+        with self.breaker.guard():
+            response = self._get(file, stream=True)
+            size = 0
+            try:
+                with open(path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+            finally:
+                response.close()
+        return size
+
+    def download_head(self, file: Dict, max_lines: int, max_bytes: int = 1024 * 1024) -> bytes:
+        """Download only the first ``max_lines`` complete lines of a file.
+
+        Stops reading after ``max_bytes`` so a file without newlines cannot
+        pull in the whole body.
+        """
+        with self.breaker.guard():
+            response = self._get(file, stream=True)
+            head = bytearray()
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    head.extend(chunk)
+                    if head.count(b"\n") >= max_lines or len(head) >= max_bytes:
+                        break
+                else:
+                    return bytes(head)
+            finally:
+                response.close()
+        if head.count(b"\n") >= max_lines:
+            return b"\n".join(bytes(head).split(b"\n")[:max_lines])
+        # Hit max_bytes first: drop the trailing partial line
+        end = head.rfind(b"\n")
+        return bytes(head[:end] if end > 0 else head)
@@ -0,0 +1,91 @@
+import io
+from typing import Dict
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Rows read up front to choose the dtype of each text column
+SAMPLE_ROWS = 1000
+# Text columns with at most this share of distinct values in the sample become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# Text that read_csv turns into booleans when a whole chunk of a column is boolean
+BOOLEAN_VALUES = ["True", "TRUE", "true", "False", "FALSE", "false"]
+# Peak memory of a compact job relative to the CSV size, instead of the default expansion factor
+COMPACT_EXPANSION_FACTOR = 4
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def compact_dtypes(file_content: bytes, **read_kwargs) -> Dict[int, str]:
+    """Choose memory-efficient dtypes for the text columns of a CSV from its first rows.
+
+    Repetitive text columns are read as categoricals; other text columns as
+    Arrow-backed strings when pyarrow is installed. Keys are column
+    positions, so duplicate header names are handled. Returns an empty dict
+    if the sample cannot be parsed.
+    """
+    try:
+        sample = pd.read_csv(io.BytesIO(file_content), nrows=SAMPLE_ROWS, **read_kwargs)
+    except Exception:
+        return {}
+    dtypes = {}
+    for position, (_, series) in enumerate(sample.items()):
+        if not _is_text(series) or not len(series):
+            continue
+        if series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+            dtypes[position] = "category"
+        elif HAS_PYARROW:
+            dtypes[position] = "string[pyarrow]"
+    return dtypes
+
+
+def _has_typed_values(series: pd.Series) -> bool:
+    """Return True if some values would not stay text without a forced dtype.
+
+    read_csv infers dtypes per chunk of rows, so a column whose sample is
+    text can still have numbers (``1.50`` written back as ``1.5``) or
+    booleans further down.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = pd.Series(series.cat.categories, dtype=object)
+    else:
+        values = pd.Series(series.dropna().unique(), dtype=object)
+    return bool(pd.to_numeric(values, errors="coerce").notna().any() or values.isin(BOOLEAN_VALUES).any())
+
+
+def downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Store integer columns in the smallest integer type that holds their values.
+
+    Transforms widen these columns back to int64 before any arithmetic, so
+    results are the same as without downcasting.
+    """
+    for position, (_, series) in enumerate(df.items()):
+        if pd.api.types.is_signed_integer_dtype(series):
+            df.isetitem(position, pd.to_numeric(series, downcast="integer"))
+    return df
+
+
+def read_csv_compact(file_content: bytes, **read_kwargs) -> pd.DataFrame:
+    """Parse a CSV with compact text dtypes and downcast integers.
+
+    The bytes are parsed directly: a decoded ``str`` in a StringIO would
+    take up to four bytes per character. Serializing the result with
+    ``to_csv`` gives the same text as a frame parsed with the default dtypes:
+    if the sample was not representative and a forced text column holds
+    numbers or booleans, the file is parsed again without forcing it.
+    """
+    dtypes = compact_dtypes(file_content, **read_kwargs)
+    df = pd.read_csv(io.BytesIO(file_content), dtype=dtypes or None, **read_kwargs)
+    typed = [position for position in dtypes if _has_typed_values(df.iloc[:, position])]
+    if typed:
+        dtypes = {position: dtype for position, dtype in dtypes.items() if position not in typed}
+        df = None
+        df = pd.read_csv(io.BytesIO(file_content), dtype=dtypes or None, **read_kwargs)
+    return downcast_integers(df)
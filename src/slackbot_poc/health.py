@@ -0,0 +1,63 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    server: "HealthServer"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            status, body = 200, {"status": "ok"}
+        elif path == "/readyz":
+            report = self.server.report()
+            status, body = (200 if report.get("ready") else 503), report
+        else:
+            status, body = 404, {"error": "not found"}
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug("Health check: " + format, *args)
+
+
+class HealthServer(ThreadingHTTPServer):
+    """Serve /healthz (liveness) and /readyz (readiness) on a local port.
+
+    ``report`` returns the readiness report; /readyz answers 503 unless it
+    contains ``"ready": True``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], report: Callable[[], Dict]):
+        super().__init__(address, _HealthHandler)
+        self.report = report
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> None:
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="health-server", daemon=True)
+        self._thread.start()
+        logger.info("Health endpoint listening on %s:%d", self.server_address[0], self.port)
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
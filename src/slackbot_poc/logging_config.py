@@ -0,0 +1,120 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+# Structured fields copied from ``extra={...}`` into JSON records
+CONTEXT_FIELDS = (
+    "job_id",
+    "channel",
+    "user",
+    "file_id",
+    "file_name",
+    "size_bytes",
+    "estimate_bytes",
+    "wait_ms",
+    "timings_ms",
+    "worker",
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                payload[name] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only every Nth occurrence of records logged with ``extra={"sample_every": N}``.
+
+    Occurrences are counted per logger and message template, so one noisy
+    call site does not hide another. Records without ``sample_every`` and
+    warnings or worse always pass.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counters: Dict[tuple, itertools.count] = defaultdict(itertools.count)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample_every", None)
+        if not every or every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            seen = next(self._counters[(record.name, record.msg)])
+        return seen % every == 0
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as-is so message formatting happens on the listener thread.
+
+    The stock QueueHandler formats the message in the logging thread before
+    enqueueing it. Records stay in this process, so there is no need to
+    make them picklable first.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(level: str = "INFO", log_format: str = "json") -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a background thread.
+
+    Calling code only pays for creating a record and putting it on the queue;
+    formatting and writing to stderr happen on the listener thread.
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stderr)
+    if log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -3,14 +3,51 @@
 Main entry point for the Slack CSV bot.
 """
 
+import argparse
+
 from .bot import SlackCSVBot
+from .config import ConfigError, load_settings
+from .logging_config import configure_logging
+from .supervisor import Supervisor
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="slackbot-poc", description="Slack bot for processing CSV files")
+    parser.add_argument("--config", help="TOML settings file (default: $CSV_BOT_CONFIG)")
+    subparsers = parser.add_subparsers(dest="command")
+    serve = subparsers.add_parser("serve", help="Run the bot")
+    serve.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of bot processes, each with its own Slack connection; they share the memory "
+            "budget and CPU cores. Not to be confused with CSV_BOT_WORKERS, the job threads of "
+            "each process (default: 1)"
+        )
+    )
+    return parser
 
 
-def main():
+def main(argv=None):
     """Main function to start the Slack CSV bot."""
-    bot = SlackCSVBot()
-    bot.start()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    workers = getattr(args, "workers", 1)
+
+    try:
+        settings = load_settings(config_file=args.config).require_tokens()
+    except ConfigError as e:
+        parser.exit(2, f"slackbot-poc: {e}\n")
+    configure_logging(settings.log_level, settings.log_format)
+
+    if workers > 1:
+        Supervisor(workers, shutdown_timeout=settings.drain_timeout + 5, settings=settings).run()
+    else:
+        bot = SlackCSVBot(settings)
+        bot.start()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
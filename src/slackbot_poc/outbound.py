@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_WINDOW = 1.0
+DEFAULT_MAX_LENGTH = 4000
+
+
+class TTLCache:
+    """Remember keys for ``ttl`` seconds, evicting the oldest past ``max_entries``."""
+
+    def __init__(self, ttl: float, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, key: Hashable) -> bool:
+        """Return True if ``key`` was added less than ``ttl`` seconds ago, otherwise add it."""
+        now = self.clock()
+        with self._lock:
+            added = self._entries.get(key)
+            if added is not None and now - added < self.ttl:
+                return True
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return False
+
+
+class MessageCoalescer:
+    """Merge text replies to the same channel (or thread) sent within ``window`` seconds.
+
+    The first message to a channel starts the window; everything sent to
+    that channel until it closes is posted as one message, with identical
+    lines sent only once. Merged text is split into several messages if it
+    would exceed ``max_length``. A window of 0 posts every message right
+    away.
+    """
+
+    def __init__(
+        self,
+        post: Callable[[str, str, Optional[str]], None],
+        window: float = DEFAULT_WINDOW,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ):
+        self.post = post
+        self.window = window
+        self.max_length = max_length
+        self._pending: Dict[Tuple[str, Optional[str]], List[str]] = {}
+        self._timers: Dict[Tuple[str, Optional[str]], threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def send(self, channel: str, text: str, thread_ts: Optional[str] = None) -> None:
+        """Queue ``text`` for the channel, or post it right away without a window."""
+        if self.window <= 0:
+            self.post(channel, text, thread_ts)
+            return
+        key = (channel, thread_ts)
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = []
+                timer = threading.Timer(self.window, self._flush_key, (key,))
+                timer.daemon = True
+                self._timers[key] = timer
+                timer.start()
+            if text not in batch:
+                batch.append(text)
+
+    def _merge(self, texts: List[str]) -> List[str]:
+        messages: List[str] = []
+        for text in texts:
+            if messages and len(messages[-1]) + 1 + len(text) <= self.max_length:
+                messages[-1] += "\n" + text
+            else:
+                messages.append(text)
+        return messages
+
+    def _flush_key(self, key: Tuple[str, Optional[str]]) -> None:
+        with self._lock:
+            texts = self._pending.pop(key, [])
+            timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        channel, thread_ts = key
+        for message in self._merge(texts):
+            self.post(channel, message, thread_ts)
+
+    def flush(self) -> None:
+        """Post everything still waiting for its window to close."""
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self._flush_key(key)
+
+    def pending(self) -> int:
+        """Number of channels with messages waiting to be posted."""
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,276 @@
+import csv
+import io
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .csv_processor import (
+    FileResult,
+    _head,
+    _process_one_tolerant,
+    _quarantine_rows,
+    check_comma_separation,
+    process_csv_files,
+)
+from .transforms import Transform, apply_transforms
+
+# Each worker parses ranges of about this size, so peak memory depends on
+# the number of processes rather than the size of the file
+PARALLEL_CHUNK_BYTES = 32 * 1024 * 1024
+# Quotes are counted in windows of this size to bound temporary arrays
+QUOTE_SCAN_BYTES = 16 * 1024 * 1024
+QUOTE = ord('"')
+NEWLINE = ord('\n')
+
+
+def _count_byte(data: np.ndarray, start: int, end: int, byte: int) -> int:
+    count = 0
+    for window in range(start, end, QUOTE_SCAN_BYTES):
+        count += int(np.count_nonzero(data[window:min(end, window + QUOTE_SCAN_BYTES)] == byte))
+    return count
+
+
+def _count_quotes(data: np.ndarray, start: int, end: int) -> int:
+    return _count_byte(data, start, end, QUOTE)
+
+
+def _next_record_end(buffer, data: np.ndarray, pos: int, quotes: int) -> Tuple[int, int]:
+    """Return the offset after the next newline outside quotes, and the quote count up to it.
+
+    ``quotes`` is the number of quotes since the last record boundary. A
+    newline ends a record when the number of quotes before it is even;
+    escaped quotes ("") come in pairs so they do not change the parity.
+    Returns -1 if there is no such newline.
+    """
+    while True:
+        newline = buffer.find(b"\n", pos)
+        if newline == -1:
+            return -1, quotes
+        quotes += _count_quotes(data, pos, newline)
+        pos = newline + 1
+        if quotes % 2 == 0:
+            return pos, quotes
+
+
+def split_records(buffer, parts: int, start: int = 0) -> List[int]:
+    """Split ``buffer[start:]`` into about ``parts`` ranges at record boundaries.
+
+    Returns the boundary offsets, beginning with ``start`` and ending with
+    the buffer length.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    size = len(buffer)
+    step = max(1, (size - start) // max(1, parts))
+    bounds = [start]
+    pos, quotes = start, 0
+    for goal in range(start + step, size, step):
+        if goal <= bounds[-1]:
+            continue
+        quotes += _count_quotes(data, pos, goal)
+        end, quotes = _next_record_end(buffer, data, goal, quotes)
+        if end == -1 or end >= size:
+            break
+        bounds.append(end)
+        pos, quotes = end, 0
+    bounds.append(size)
+    return bounds
+
+
+def _dtype_signature(df: pd.DataFrame) -> Tuple:
+    return tuple((str(column), str(dtype)) for column, dtype in df.dtypes.items())
+
+
+def _is_number(dtype: str) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def unify_dtypes(signatures: List[Tuple]) -> Dict[int, str]:
+    """Return the dtypes to re-parse with, by column position, so that every range agrees.
+
+    As for a parse of the whole file, a column that is numeric in every
+    range but not always integer (e.g. one blank value) becomes float64;
+    any other disagreement is read as text, keeping the original values.
+    """
+    dtypes = {}
+    for position, column in enumerate(zip(*signatures)):
+        kinds = {dtype for _, dtype in column}
+        if len(kinds) > 1:
+            dtypes[position] = "float64" if all(_is_number(kind) for kind in kinds) else "str"
+    return dtypes
+
+
+def _parse_range(
+    path: str,
+    header_end: int,
+    start: int,
+    end: int,
+    transforms: Optional[List[Transform]],
+    part_path: str,
+    first: bool,
+    tolerant: bool = False,
+    dtypes: Optional[Dict[int, str]] = None,
+) -> Tuple[Tuple, int, Optional[str]]:
+    """Parse and transform one byte range of the file and write it to ``part_path``.
+
+    Runs in a worker process. Returns the dtypes pandas inferred, so the
+    caller can check that every range agrees with the others, and in
+    tolerant mode the number of malformed rows skipped with their
+    quarantine CSV (line numbers relative to the range).
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        chunk = buffer[:header_end] + buffer[start:end]
+    read_kwargs = {"dtype": dtypes} if dtypes else {}
+    quarantine, bad_rows = None, 0
+    try:
+        df = pd.read_csv(io.BytesIO(chunk), **read_kwargs)
+    except pd.errors.ParserError:
+        if not tolerant:
+            raise
+        df = pd.read_csv(io.BytesIO(chunk), on_bad_lines="skip", **read_kwargs)
+        quarantine, bad_rows = _quarantine_rows(chunk.decode("utf-8"), len(df.columns))
+    signature = _dtype_signature(df)
+    apply_transforms(df, transforms)
+    df.to_csv(part_path, index=False, header=first)
+    return signature, bad_rows, quarantine
+
+
+def _merge_quarantine(buffer, header_end: int, bounds: List[int], results: List[Tuple]) -> Tuple[Optional[str], int]:
+    """Combine the quarantine CSVs of the ranges, renumbering rows to lines of the whole file."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    header_lines = _count_byte(data, 0, header_end, NEWLINE)
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    total, lines_before, counted_to = 0, 0, 0
+    for start, (_, bad_rows, quarantine) in zip(bounds, results):
+        if not bad_rows:
+            continue
+        lines_before += _count_byte(data, counted_to, start, NEWLINE)
+        counted_to = start
+        reader = csv.reader(io.StringIO(quarantine))
+        header = next(reader)
+        if not total:
+            writer.writerow(header)
+        for row in reader:
+            writer.writerow([int(row[0]) - header_lines + lines_before] + row[1:])
+        total += bad_rows
+    return (output.getvalue(), total) if total else (None, 0)
+
+
+def _process_serial(
+    input_path: str,
+    output_path: str,
+    transforms: Optional[List[Transform]],
+    tolerant: bool,
+    compact: bool = False,
+) -> FileResult:
+    """Process the whole file in this process with the regular code path."""
+    with open(input_path, "rb") as f:
+        content = f.read()
+    if tolerant:
+        result = _process_one_tolerant(content, 0, transforms, compact)
+    else:
+        processed = process_csv_files([content], transforms, compact)
+        result = FileResult(error=processed) if isinstance(processed, str) else FileResult(content=processed[0])
+    if result.ok:
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            f.write(result.content)
+        result.content = None
+    return result
+
+
+def process_csv_file_parallel(
+    input_path: str,
+    output_path: str,
+    transforms: Optional[List[Transform]] = None,
+    processes: Optional[int] = None,
+    tolerant: bool = True,
+    compact: bool = False,
+) -> FileResult:
+    """Process one large CSV file on several cores and write the result to ``output_path``.
+
+    The file is memory-mapped and split into ranges at newlines outside
+    quoted fields. Each range is parsed with the header, transformed and
+    written in a worker process, then the parts are concatenated in order.
+    If pandas infers different dtypes in different ranges (e.g. an integer
+    column with a blank value in one range), the ranges that disagree are
+    parsed again with the dtypes from unify_dtypes. In tolerant mode each
+    range quarantines its own malformed rows. The whole file is never read
+    into memory, so a job only needs memory for the ranges in flight.
+
+    On success the returned FileResult has no content; the CSV is in
+    ``output_path``. Workers are spawned, so only transforms registered at
+    import time are available to them. ``processes`` below 2 and files
+    without data rows are processed serially in memory. ``compact`` only
+    applies there: ranges are already small, and downcast dtypes would
+    differ between them.
+    """
+    processes = processes or os.cpu_count() or 1
+    size = os.path.getsize(input_path)
+    if processes < 2 or size == 0:
+        return _process_serial(input_path, output_path, transforms, tolerant, compact)
+
+    with open(input_path, "rb") as f:
+        sample = f.read(64 * 1024)
+    if not check_comma_separation(_head(sample)):
+        return FileResult(error="Please send csv file with comma(,).")
+
+    with open(input_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        header_end, _ = _next_record_end(buffer, np.frombuffer(buffer, dtype=np.uint8), 0, 0)
+        if header_end == -1 or header_end >= size:
+            if size > PARALLEL_CHUNK_BYTES:
+                return FileResult(error="Please send csv file")
+            return _process_serial(input_path, output_path, transforms, tolerant, compact)
+        parts = max(processes, -(-size // PARALLEL_CHUNK_BYTES))
+        bounds = split_records(buffer, parts, start=header_end)
+
+    ranges = list(zip(bounds, bounds[1:]))
+    with tempfile.TemporaryDirectory(prefix="slackbot-parts-") as parts_dir:
+        part_paths = [os.path.join(parts_dir, f"part-{i:05d}.csv") for i in range(len(ranges))]
+
+        def parse(indexes, dtypes=None):
+            futures = [
+                pool.submit(
+                    _parse_range, input_path, header_end, *ranges[i], transforms, part_paths[i], i == 0,
+                    tolerant, dtypes,
+                )
+                for i in indexes
+            ]
+            return [future.result() for future in futures]
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(processes, len(ranges)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                results = parse(range(len(ranges)))
+                signatures = [signature for signature, _, _ in results]
+                if all(str(column).startswith('Unnamed:') for column, _ in signatures[0]):
+                    return FileResult(error="Please send csv file")
+                dtypes = unify_dtypes(signatures)
+                if dtypes:
+                    target = tuple(
+                        (column, dtypes.get(position, dtype)) for position, (column, dtype) in enumerate(signatures[0])
+                    )
+                    redo = [i for i, signature in enumerate(signatures) if signature != target]
+                    for i, result in zip(redo, parse(redo, dtypes)):
+                        results[i] = result
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+            return FileResult(error="Please send csv file")
+        except Exception as e:
+            return FileResult(error=f"Error processing file 1: {str(e)}")
+
+        with open(output_path, "wb") as output:
+            for part_path in part_paths:
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, output)
+
+    with open(input_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        quarantine, bad_rows = _merge_quarantine(buffer, header_end, bounds, results)
+    return FileResult(quarantine=quarantine, bad_rows=bad_rows)
@@ -0,0 +1,321 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from .admission import MB, AdmissionController
+
+logger = logging.getLogger(__name__)
+
+WAIT_SAMPLES = 1000
+# How often idle workers re-check jobs waiting for memory, so they time out on schedule
+ADMISSION_POLL_INTERVAL = 1.0
+
+
+@dataclass
+class Job:
+    """A unit of work queued on behalf of a channel and user."""
+    channel: str
+    user: Optional[str]
+    fn: Callable[[], None]
+    job_id: Optional[str] = None
+    memory: int = 0
+    on_timeout: Optional[Callable[[], None]] = None
+    thread_ts: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    blocked_since: Optional[float] = None
+    expired: bool = False
+
+
+class _ChannelQueue:
+    """Per-channel state: per-user FIFOs served round-robin, plus DRR bookkeeping."""
+
+    def __init__(self, weight: int):
+        self.weight = weight
+        self.deficit = 0
+        self.running = 0
+        self.users: "OrderedDict[Optional[str], Deque[Job]]" = OrderedDict()
+        self.completed = 0
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.max_wait = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(jobs) for jobs in self.users.values())
+
+    def push(self, job: Job) -> None:
+        self.users.setdefault(job.user, deque()).append(job)
+
+    def peek(self) -> Job:
+        return next(iter(self.users.values()))[0]
+
+    def pop(self) -> Job:
+        user, jobs = next(iter(self.users.items()))
+        job = jobs.popleft()
+        if jobs:
+            self.users.move_to_end(user)
+        else:
+            del self.users[user]
+        return job
+
+    def record_wait(self, wait: float) -> None:
+        self.waits.append(wait)
+        self.max_wait = max(self.max_wait, wait)
+
+
+class FairScheduler:
+    """Run queued jobs on a pool of worker threads, fairly across channels.
+
+    Channels are served with deficit round-robin: each visit credits a channel
+    with its weight and every job costs one credit, so a priority channel with
+    weight 3 gets three jobs dispatched for every one of a normal channel.
+    Within a channel, users are served round-robin, and no channel may have
+    more than ``channel_limit`` jobs running at once.
+
+    With an ``admission`` controller, a job's memory is reserved before it is
+    dispatched. A job that does not fit stays queued and its channel is
+    skipped, so it never holds a worker while waiting; after
+    ``admission_timeout`` seconds of waiting its ``on_timeout`` is called
+    instead of running it.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        channel_limit: int = 2,
+        priority_channels: Optional[Dict[str, int]] = None,
+        admission: Optional[AdmissionController] = None,
+        admission_timeout: Optional[float] = None,
+    ):
+        if workers < 1 or channel_limit < 1:
+            raise ValueError("Worker count and channel limit must be at least 1")
+        self.workers = workers
+        self.channel_limit = channel_limit
+        self.priority_channels = dict(priority_channels or {})
+        self.admission = admission
+        self.admission_timeout = admission_timeout
+        self._channels: Dict[str, _ChannelQueue] = {}
+        self._active: Deque[str] = deque()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._in_flight: Dict[int, Job] = {}
+        self._live_workers = 0
+        self._started = False
+        self._draining = False
+        self._stopping = False
+
+    def _channel(self, channel: str) -> _ChannelQueue:
+        if channel not in self._channels:
+            self._channels[channel] = _ChannelQueue(self.priority_channels.get(channel, 1))
+        return self._channels[channel]
+
+    def submit(
+        self,
+        channel: str,
+        user: Optional[str],
+        fn: Callable[[], None],
+        job_id: Optional[str] = None,
+        memory: int = 0,
+        on_timeout: Optional[Callable[[], None]] = None,
+        thread_ts: Optional[str] = None,
+    ) -> None:
+        """Queue ``fn`` to run on behalf of ``channel`` and ``user``.
+
+        ``memory`` is the estimate reserved with the admission controller
+        while the job runs. ``thread_ts`` is the thread replies about the
+        job belong in.
+        """
+        with self._condition:
+            queue = self._channel(channel)
+            if not len(queue):
+                self._active.append(channel)
+            queue.push(Job(channel, user, fn, job_id, memory, on_timeout, thread_ts))
+            self._condition.notify()
+
+    def _reserve(self, job: Job) -> bool:
+        """Reserve the job's memory, or mark it expired once it waited too long. Caller holds the lock."""
+        if self.admission is None or self.admission.try_acquire(job.memory, id(job)):
+            return True
+        now = time.monotonic()
+        if job.blocked_since is None:
+            job.blocked_since = now
+            logger.info(
+                "Waiting for memory budget (estimated %d MB)", job.memory // MB,
+                extra={"job_id": job.job_id, "channel": job.channel, "user": job.user, "estimate_bytes": job.memory}
+            )
+        elif self.admission_timeout is not None and now - job.blocked_since > self.admission_timeout:
+            self.admission.withdraw(id(job))
+            job.expired = True
+            return True
+        return False
+
+    def _next_job(self) -> Optional[Job]:
+        """Pick the next job by deficit round-robin. Caller holds the lock."""
+        if self._draining:
+            return None
+        for _ in range(len(self._active)):
+            channel = self._active[0]
+            queue = self._channels[channel]
+            if queue.running >= self.channel_limit or not self._reserve(queue.peek()):
+                self._active.rotate(-1)
+                continue
+            if queue.deficit < 1:
+                queue.deficit += queue.weight
+            job = queue.pop()
+            queue.deficit -= 1
+            if not len(queue):
+                queue.deficit = 0
+                self._active.popleft()
+            elif queue.deficit < 1:
+                self._active.rotate(-1)
+            return job
+        return None
+
+    def _poll_interval(self) -> Optional[float]:
+        """How long an idle worker may sleep. Caller holds the lock."""
+        if self.admission is not None and self.admission_timeout is not None and self._active:
+            return ADMISSION_POLL_INTERVAL
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                job = None
+                while not self._stopping and self._live_workers <= self.workers:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._condition.wait(self._poll_interval())
+                if job is None:
+                    self._live_workers -= 1
+                    return
+                queue = self._channels[job.channel]
+                wait = time.monotonic() - job.enqueued_at
+                if not job.expired:
+                    queue.running += 1
+                    self._in_flight[id(job)] = job
+                    queue.record_wait(wait)
+            context = {"job_id": job.job_id, "channel": job.channel, "user": job.user, "wait_ms": round(wait * 1000, 1)}
+            if job.expired:
+                logger.warning("Job timed out waiting for memory after %.3fs in queue", wait, extra=context)
+                try:
+                    if job.on_timeout is not None:
+                        job.on_timeout()
+                except Exception:
+                    logger.exception("Unhandled error in job timeout handler", extra=context)
+                continue
+            logger.info("Starting job after %.3fs in queue", wait, extra=context)
+            try:
+                job.fn()
+            except Exception:
+                logger.exception("Unhandled error in job", extra=context)
+            finally:
+                if self.admission is not None:
+                    self.admission.release(job.memory)
+                with self._condition:
+                    queue.running -= 1
+                    queue.completed += 1
+                    del self._in_flight[id(job)]
+                    self._condition.notify_all()
+
+    def cancel_pending(self) -> List[Job]:
+        """Stop dispatching new jobs and return the ones that never started."""
+        with self._condition:
+            self._draining = True
+            pending = []
+            for channel in self._active:
+                queue = self._channels[channel]
+                while len(queue):
+                    job = queue.pop()
+                    if self.admission is not None:
+                        self.admission.withdraw(id(job))
+                    pending.append(job)
+                queue.deficit = 0
+            self._active.clear()
+            return pending
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no job is running. Returns False if ``timeout`` expired."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._in_flight, timeout)
+
+    def in_flight(self) -> List[Job]:
+        """Return the jobs currently running."""
+        with self._condition:
+            return list(self._in_flight.values())
+
+    def queue_depth(self) -> int:
+        """Return the number of jobs waiting to start."""
+        with self._condition:
+            return sum(len(self._channels[channel]) for channel in self._active)
+
+    def _spawn_workers(self) -> None:
+        """Start threads until ``workers`` are live. Caller holds the lock."""
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while self._live_workers < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"csv-worker-{len(self._threads)}", daemon=True)
+            self._live_workers += 1
+            thread.start()
+            self._threads.append(thread)
+
+    def configure(
+        self,
+        workers: int,
+        channel_limit: int,
+        priority_channels: Optional[Dict[str, int]] = None,
+        admission_timeout: Optional[float] = None,
+    ) -> None:
+        """Change pool size, channel cap, priorities and memory wait while running.
+
+        Surplus workers exit once their current job finishes. Waiting jobs
+        are re-checked, e.g. against a larger memory budget.
+        """
+        if workers < 1 or channel_limit < 1:
+            raise ValueError("Worker count and channel limit must be at least 1")
+        with self._condition:
+            self.workers = workers
+            self.channel_limit = channel_limit
+            self.priority_channels = dict(priority_channels or {})
+            self.admission_timeout = admission_timeout
+            for channel, queue in self._channels.items():
+                queue.weight = self.priority_channels.get(channel, 1)
+            if self._started:
+                self._spawn_workers()
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        with self._condition:
+            self._stopping = False
+            self._draining = False
+            self._started = True
+            self._spawn_workers()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers once their current job finishes."""
+        with self._condition:
+            self._stopping = True
+            self._started = False
+            self._condition.notify_all()
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout)
+        with self._condition:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Return queue depth, running jobs and queue-wait statistics per channel."""
+        with self._condition:
+            report = {}
+            for channel, queue in self._channels.items():
+                waits = sorted(queue.waits)
+                report[channel] = {
+                    "queued": len(queue),
+                    "running": queue.running,
+                    "completed": queue.completed,
+                    "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                    "wait_p99": waits[min(len(waits) - 1, int(len(waits) * 0.99))] if waits else 0.0,
+                    "wait_max": queue.max_wait,
+                }
+            return report
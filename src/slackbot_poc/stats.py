@@ -0,0 +1,134 @@
+import csv
+import io
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Union
+
+import pandas as pd
+
+# Rows parsed at a time; memory stays at one chunk plus one accumulator per column
+STATS_CHUNK_ROWS = 50_000
+# CSV text per chunk that chunk_rows aims for; the bot admits stats jobs by this, not the file size
+STATS_CHUNK_BYTES = 4 * 1024 * 1024
+# Peak memory relative to the text of one chunk (parsed frame, text columns as Python strings)
+STATS_EXPANSION_FACTOR = 10
+STATS_HEADER = ["column", "count", "min", "max", "mean", "sum"]
+
+
+@dataclass
+class ColumnStats:
+    """Mergeable count/min/max/sum accumulator for one column.
+
+    ``count`` is the number of non-empty values. A column that holds
+    non-numeric values in any chunk only reports its count, whichever
+    chunk they are in. Integer sums are exact Python ints.
+    """
+    count: int = 0
+    total: float = 0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    numeric: bool = True
+
+    @property
+    def mean(self) -> Optional[float]:
+        if not self.numeric or self.count == 0:
+            return None
+        return self.total / self.count
+
+    def update(self, series: pd.Series) -> "ColumnStats":
+        """Add the values of one chunk."""
+        values = series.dropna()
+        self.count += len(values)
+        if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            self._clear()
+        elif len(values) and self.numeric:
+            if pd.api.types.is_integer_dtype(values):
+                # int64 sums wrap around silently
+                self.total += int(values.astype(object).sum())
+            else:
+                self.total += values.sum().item()
+            self.min = _pick(min, self.min, values.min().item())
+            self.max = _pick(max, self.max, values.max().item())
+        return self
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        """Combine with the stats of another chunk of the same column."""
+        merged = ColumnStats(
+            count=self.count + other.count,
+            total=self.total + other.total,
+            min=_pick(min, self.min, other.min),
+            max=_pick(max, self.max, other.max),
+        )
+        if not (self.numeric and other.numeric):
+            merged._clear()
+        return merged
+
+    def _clear(self) -> None:
+        """Drop the numeric stats once the column is known not to be numeric."""
+        self.numeric = False
+        self.total = 0
+        self.min = None
+        self.max = None
+
+
+def _pick(choose, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return choose(a, b)
+
+
+def merge_stats(parts: Iterable[Dict[str, ColumnStats]]) -> Dict[str, ColumnStats]:
+    """Merge per-column stats computed over separate chunks, keeping column order."""
+    merged: Dict[str, ColumnStats] = {}
+    for part in parts:
+        for column, stats in part.items():
+            merged[column] = merged[column].merge(stats) if column in merged else stats
+    return merged
+
+
+def chunk_rows(head: bytes) -> int:
+    """Rows per chunk so a chunk holds about STATS_CHUNK_BYTES of text, judged by the first lines."""
+    lines = head.count(b"\n")
+    if not lines:
+        return STATS_CHUNK_ROWS
+    return max(1, STATS_CHUNK_BYTES * lines // len(head))
+
+
+def chunk_stats(chunk: pd.DataFrame) -> Dict[str, ColumnStats]:
+    """Compute the stats of one chunk."""
+    return {column: ColumnStats().update(chunk[column]) for column in chunk.columns}
+
+
+def compute_stats(source: Union[bytes, str], chunksize: int = STATS_CHUNK_ROWS) -> Dict[str, ColumnStats]:
+    """Compute per-column stats in one streaming pass over the CSV bytes or the file at a path.
+
+    Each chunk is summarized on its own and merged into the running result,
+    so only one chunk is in memory at a time.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with pd.read_csv(source, chunksize=chunksize) as reader:
+        return merge_stats(chunk_stats(chunk) for chunk in reader)
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.6g}"
+    return str(value)
+
+
+def format_stats(stats: Dict[str, ColumnStats]) -> str:
+    """Render stats as a small CSV table, one row per column."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(STATS_HEADER)
+    for column, column_stats in stats.items():
+        total = column_stats.total if column_stats.numeric else None
+        values = (column_stats.min, column_stats.max, column_stats.mean, total)
+        writer.writerow([column, column_stats.count] + [_format_value(value) for value in values])
+    return output.getvalue()
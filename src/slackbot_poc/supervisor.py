@@ -0,0 +1,265 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional
+
+from .config import Settings
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 5.0
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+# A worker that stayed up this long is considered healthy again after a crash
+STABLE_AFTER = 60.0
+
+
+def run_worker(
+    index: int,
+    metrics_queue,
+    heartbeat_interval: float,
+    settings: Optional[Settings] = None,
+    workers: int = 1,
+) -> None:
+    """Run one bot in this process and report its metrics to the supervisor.
+
+    The bot gets a ``1 / workers`` share of the memory budget and parse
+    processes, so all workers together stay within the configured limits.
+    """
+    from .bot import SlackCSVBot
+    from .logging_config import configure_logging
+
+    if settings is not None:
+        configure_logging(settings.log_level, settings.log_format)
+        if settings.health_port:
+            # Each worker serves its own health endpoint on consecutive ports
+            settings = replace(settings, health_port=settings.health_port + index)
+    bot = SlackCSVBot(settings, processes=workers)
+
+    def report():
+        while True:
+            try:
+                metrics_queue.put((index, os.getpid(), bot.metrics()))
+            except Exception as e:
+                logger.error("Worker %d failed to report metrics: %s", index, e, extra={"worker": index})
+            time.sleep(heartbeat_interval)
+
+    threading.Thread(target=report, name="metrics-reporter", daemon=True).start()
+    bot.start()
+
+
+@dataclass
+class WorkerSlot:
+    """Supervisor-side state of one worker process."""
+    index: int
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    started_at: float = 0.0
+    last_heartbeat: float = 0.0
+    restarts: int = 0
+    backoff: float = INITIAL_BACKOFF
+    restart_at: Optional[float] = None
+    metrics: Dict = field(default_factory=dict)
+
+
+class Supervisor:
+    """Run N bot worker processes, restart them on crash and aggregate metrics.
+
+    Each worker keeps its own socket-mode connection; Slack spreads events
+    across all open connections of an app, so throughput scales with the
+    number of processes rather than one interpreter. Workers send a metrics
+    snapshot every ``heartbeat_interval`` seconds, and a worker that stops
+    reporting for ``heartbeat_timeout`` seconds is killed and restarted.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        heartbeat_timeout: Optional[float] = None,
+        shutdown_timeout: float = 30.0,
+        target: Callable = run_worker,
+        settings: Optional[Settings] = None,
+    ):
+        if workers < 1:
+            raise ValueError("Worker count must be at least 1")
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout or heartbeat_interval * 6
+        self.shutdown_timeout = shutdown_timeout
+        self.target = target
+        self.settings = settings
+        self.context = multiprocessing.get_context("spawn")
+        self.metrics_queue = self.context.Queue()
+        self.slots: List[WorkerSlot] = [WorkerSlot(index) for index in range(workers)]
+        self.running = False
+
+    def _spawn(self, slot: WorkerSlot) -> None:
+        process = self.context.Process(
+            target=self.target,
+            args=(slot.index, self.metrics_queue, self.heartbeat_interval, self.settings, len(self.slots)),
+            name=f"slackbot-worker-{slot.index}",
+        )
+        process.start()
+        now = time.monotonic()
+        slot.process = process
+        slot.started_at = now
+        slot.last_heartbeat = now
+        slot.restart_at = None
+        logger.info("Started worker %d (pid %d)", slot.index, process.pid, extra={"worker": slot.index})
+
+    def collect_metrics(self, timeout: float = 0.0) -> None:
+        """Read pending metrics snapshots from the workers."""
+        try:
+            item = self.metrics_queue.get(timeout=timeout) if timeout else self.metrics_queue.get_nowait()
+        except queue.Empty:
+            return
+        while True:
+            index, pid, metrics = item
+            slot = self.slots[index]
+            if slot.process is not None and slot.process.pid == pid:
+                slot.last_heartbeat = time.monotonic()
+                slot.metrics = metrics
+            try:
+                item = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def check_workers(self) -> None:
+        """Restart workers that exited or stopped sending heartbeats."""
+        now = time.monotonic()
+        for slot in self.slots:
+            if slot.restart_at is not None:
+                if now >= slot.restart_at:
+                    self._spawn(slot)
+                continue
+            if slot.process is None:
+                continue
+            alive = slot.process.is_alive()
+            if alive and now - slot.last_heartbeat > self.heartbeat_timeout:
+                logger.warning(
+                    "Worker %d (pid %d) stopped responding, killing it",
+                    slot.index, slot.process.pid, extra={"worker": slot.index}
+                )
+                slot.process.kill()
+                slot.process.join(5)
+                alive = False
+            if not alive:
+                if now - slot.started_at > STABLE_AFTER:
+                    slot.backoff = INITIAL_BACKOFF
+                logger.warning(
+                    "Worker %d (pid %d) exited with code %s, restarting in %.0fs",
+                    slot.index, slot.process.pid, slot.process.exitcode, slot.backoff,
+                    extra={"worker": slot.index}
+                )
+                slot.restart_at = now + slot.backoff
+                slot.backoff = min(slot.backoff * 2, MAX_BACKOFF)
+                slot.restarts += 1
+                slot.metrics = {}
+
+    def health(self) -> List[Dict]:
+        """Return liveness information for every worker."""
+        now = time.monotonic()
+        return [
+            {
+                "index": slot.index,
+                "pid": slot.process.pid if slot.process else None,
+                "alive": bool(slot.process and slot.process.is_alive()),
+                "restarts": slot.restarts,
+                "heartbeat_age": now - slot.last_heartbeat if slot.process else None,
+            }
+            for slot in self.slots
+        ]
+
+    def aggregate_metrics(self) -> Dict:
+        """Combine the latest metrics snapshot of every worker.
+
+        Counts are summed and ``wait_avg`` is weighted by the jobs each worker
+        completed. Percentiles cannot be merged from summaries, so
+        ``wait_p99`` is the highest of the workers' values, an upper bound.
+        """
+        channels: Dict[str, Dict[str, float]] = {}
+        memory = {"in_use_bytes": 0, "running": 0, "waiting": 0}
+        for slot in self.slots:
+            for channel, stats in slot.metrics.get("channels", {}).items():
+                total = channels.setdefault(channel, {
+                    "queued": 0, "running": 0, "completed": 0, "wait_avg": 0.0, "wait_p99": 0.0, "wait_max": 0.0,
+                })
+                completed = stats.get("completed", 0)
+                if completed:
+                    weighted = total["wait_avg"] * total["completed"] + stats.get("wait_avg", 0.0) * completed
+                    total["wait_avg"] = weighted / (total["completed"] + completed)
+                for key in ("queued", "running", "completed"):
+                    total[key] += stats.get(key, 0)
+                for key in ("wait_p99", "wait_max"):
+                    total[key] = max(total[key], stats.get(key, 0.0))
+            for key in memory:
+                memory[key] += slot.metrics.get("memory", {}).get(key, 0)
+        return {"workers": self.health(), "channels": channels, "memory": memory}
+
+    def log_metrics(self) -> None:
+        """Log the aggregate metrics: one summary line, then one line per channel."""
+        metrics = self.aggregate_metrics()
+        alive = sum(1 for worker in metrics["workers"] if worker["alive"])
+        logger.info(
+            "Workers alive: %d/%d, running jobs: %d, waiting for memory: %d, memory in use: %d MB",
+            alive, len(self.slots), metrics["memory"]["running"], metrics["memory"]["waiting"],
+            metrics["memory"]["in_use_bytes"] // (1024 * 1024)
+        )
+        for channel, stats in metrics["channels"].items():
+            logger.info(
+                "Channel %s: queued %d, running %d, completed %d, wait avg %.3fs p99 %.3fs max %.3fs",
+                channel, stats["queued"], stats["running"], stats["completed"],
+                stats["wait_avg"], stats["wait_p99"], stats["wait_max"],
+                extra={"channel": channel}
+            )
+
+    def run(self) -> None:
+        """Start the workers and supervise them until SIGINT or SIGTERM."""
+        def signal_handler(signum, frame):
+            logger.info("Received interrupt signal. Stopping workers...")
+            self.running = False
+
+        def reload_handler(signum, frame):
+            logger.info("Forwarding SIGHUP to workers")
+            for slot in self.slots:
+                if slot.process and slot.process.is_alive():
+                    os.kill(slot.process.pid, signal.SIGHUP)
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, reload_handler)
+
+        self.running = True
+        logger.info("Starting %d worker processes...", len(self.slots))
+        for slot in self.slots:
+            self._spawn(slot)
+
+        last_report = time.monotonic()
+        try:
+            while self.running:
+                self.collect_metrics(timeout=1.0)
+                self.check_workers()
+                if time.monotonic() - last_report >= self.heartbeat_interval:
+                    last_report = time.monotonic()
+                    self.log_metrics()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Ask every worker to drain, then kill the ones that outlive the deadline."""
+        processes = [slot.process for slot in self.slots if slot.process and slot.process.is_alive()]
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker pid %d did not drain in time, killing it", process.pid)
+                process.kill()
+                process.join()
+        logger.info("All workers stopped.")
@@ -0,0 +1,183 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+INTEGER_DTYPES = ['int64', 'int32', 'int16', 'int8']
+TOKEN_PATTERN = re.compile(r"^([a-z_]+)(?:=(\S+))?$")
+
+
+class TransformError(ValueError):
+    """Raised when a transform request cannot be parsed or applied."""
+
+
+@dataclass(frozen=True)
+class TransformSpec:
+    """A registered column-wise operation."""
+    name: str
+    fn: Callable[[pd.Series, Optional[float]], pd.Series]
+    applies_to: Callable[[pd.Series], bool]
+    needs_arg: bool
+    description: str
+
+
+@dataclass(frozen=True)
+class Transform:
+    """A transform requested in a message, e.g. ``scale=3 cols=a,b``."""
+    name: str
+    arg: Optional[float] = None
+    columns: Optional[Tuple[str, ...]] = None
+
+    def describe(self) -> str:
+        spec = TRANSFORMS[self.name]
+        text = spec.description.format(arg=_format_number(self.arg))
+        if self.columns:
+            text += f" ({', '.join(self.columns)})"
+        return text
+
+
+TRANSFORMS: Dict[str, TransformSpec] = {}
+
+
+def _format_number(value: Optional[float]) -> str:
+    if value is None:
+        return ""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _is_integer(series: pd.Series) -> bool:
+    return series.dtype in INTEGER_DTYPES
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _is_float(series: pd.Series) -> bool:
+    return pd.api.types.is_float_dtype(series)
+
+
+def register_transform(
+    name: str,
+    applies_to: Callable[[pd.Series], bool] = _is_numeric,
+    needs_arg: bool = False,
+    description: str = "",
+):
+    """Register a column-wise transform under ``name``.
+
+    ``applies_to`` picks the columns the transform touches when the message
+    does not name them with ``cols=``.
+    """
+    def decorator(fn):
+        TRANSFORMS[name] = TransformSpec(name, fn, applies_to, needs_arg, description or name)
+        return fn
+    return decorator
+
+
+def _integer_arg(arg: float):
+    """Keep integer columns integer when the argument is a whole number."""
+    return int(arg) if float(arg).is_integer() else arg
+
+
+@register_transform("double", applies_to=_is_integer, description="doubled")
+def _double(series, arg):
+    return series * 2
+
+
+@register_transform("scale", needs_arg=True, description="multiplied by {arg}")
+def _scale(series, arg):
+    return series * _integer_arg(arg)
+
+
+@register_transform("add", needs_arg=True, description="added {arg}")
+def _add(series, arg):
+    return series + _integer_arg(arg)
+
+
+@register_transform("round", applies_to=_is_float, needs_arg=True, description="rounded to {arg} decimals")
+def _round(series, arg):
+    return series.round(int(arg))
+
+
+@register_transform("abs", description="absolute values")
+def _abs(series, arg):
+    return series.abs()
+
+
+DEFAULT_TRANSFORMS = [Transform("double")]
+
+
+def parse_transforms(text: str) -> List[Transform]:
+    """Parse transforms declared in a message, e.g. ``scale=3 round=1 cols=a,b``.
+
+    Words that are not registered transforms are ignored, so the request can
+    be part of a normal sentence. ``cols=`` restricts every transform in the
+    message to the named columns, and raises TransformError without one.
+    Returns an empty list if none are declared.
+    """
+    requested = []
+    columns = None
+    for token in (text or "").split():
+        match = TOKEN_PATTERN.match(token.lower())
+        if not match:
+            continue
+        name, arg = match.groups()
+        if name == "cols" and arg:
+            columns = tuple(column for column in token.split("=", 1)[1].split(",") if column)
+            continue
+        spec = TRANSFORMS.get(name)
+        if spec is None or (spec.needs_arg and arg is None):
+            # A bare word such as "round" in a sentence is not a request
+            continue
+        value = None
+        if arg is not None:
+            try:
+                value = float(arg)
+            except ValueError:
+                raise TransformError(f"Invalid value for {name}: {arg}") from None
+        requested.append((name, value))
+    if columns and not requested:
+        # Falling back to the defaults would ignore the columns the user asked for
+        raise TransformError("cols= needs a transform, e.g. double cols=a,b")
+    return [Transform(name, value, columns) for name, value in requested]
+
+
+def describe_transforms(transforms: List[Transform]) -> str:
+    """Return a human readable summary for Slack messages."""
+    return ", ".join(transform.describe() for transform in transforms)
+
+
+def apply_transforms(df: pd.DataFrame, transforms: Optional[List[Transform]] = None) -> pd.DataFrame:
+    """Apply all transforms column by column in a single pass over the frame.
+
+    Each column runs through its chain of operations once and is assigned
+    back once, so chaining transforms does not add parse or serialization
+    passes.
+    """
+    transforms = transforms or DEFAULT_TRANSFORMS
+    for transform in transforms:
+        for column in transform.columns or ():
+            if column not in df.columns:
+                raise TransformError(f"Column not found: {column}")
+            if not _is_numeric(df[column]):
+                raise TransformError(f"Column is not numeric: {column}")
+
+    for column in df.columns:
+        series = df[column]
+        changed = False
+        for transform in transforms:
+            spec = TRANSFORMS[transform.name]
+            if transform.columns is not None:
+                if column not in transform.columns:
+                    continue
+            elif not spec.applies_to(series):
+                continue
+            if pd.api.types.is_integer_dtype(series) and series.dtype.itemsize < 8:
+                # Compact parsing stores small integers narrowly; widen so results match int64 arithmetic
+                series = series.astype("int64")
+            series = spec.fn(series, transform.arg)
+            changed = True
+        if changed:
+            df[column] = series
+    return df
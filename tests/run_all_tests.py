@@ -15,6 +15,18 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 import test_csv_processor
 import test_server_integration
 import test_file_upload
+import test_admission
+import test_scheduler
+import test_supervisor
+import test_preview
+import test_config
+import test_logging
+import test_transforms
+import test_stats
+import test_parallel
+import test_circuit
+import test_outbound
+import test_dtypes
 
 
 def run_all_tests():
@@ -30,6 +42,18 @@ def run_all_tests():
     suite.addTests(loader.loadTestsFromModule(test_csv_processor))
     suite.addTests(loader.loadTestsFromModule(test_server_integration))
     suite.addTests(loader.loadTestsFromModule(test_file_upload))
+    suite.addTests(loader.loadTestsFromModule(test_admission))
+    suite.addTests(loader.loadTestsFromModule(test_scheduler))
+    suite.addTests(loader.loadTestsFromModule(test_supervisor))
+    suite.addTests(loader.loadTestsFromModule(test_preview))
+    suite.addTests(loader.loadTestsFromModule(test_config))
+    suite.addTests(loader.loadTestsFromModule(test_logging))
+    suite.addTests(loader.loadTestsFromModule(test_transforms))
+    suite.addTests(loader.loadTestsFromModule(test_stats))
+    suite.addTests(loader.loadTestsFromModule(test_parallel))
+    suite.addTests(loader.loadTestsFromModule(test_circuit))
+    suite.addTests(loader.loadTestsFromModule(test_outbound))
+    suite.addTests(loader.loadTestsFromModule(test_dtypes))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
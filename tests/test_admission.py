@@ -0,0 +1,140 @@
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.admission import AdmissionController, AdmissionRejected, MB
+
+
+class TestAdmissionController(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a controller with a small budget."""
+        self.controller = AdmissionController(budget_bytes=100 * MB, hard_cap_bytes=200 * MB, expansion_factor=2)
+    
+    def test_estimate_uses_file_sizes(self):
+        """Test estimating memory from Slack file metadata."""
+        files = [{'size': 10 * MB}, {'size': 5 * MB}, {'name': 'no_size.csv'}]
+        self.assertEqual(self.controller.estimate(files), 30 * MB)
+    
+    def test_rejects_job_above_hard_cap(self):
+        """Test that jobs above the hard cap are rejected."""
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self.controller.check(201 * MB)
+        self.assertIn("too large", str(ctx.exception))
+        self.assertIn("100 MB", str(ctx.exception))
+        self.controller.check(200 * MB)
+    
+    def test_limit_uses_given_expansion_factor(self):
+        """Test that the limit in the message matches the factor the estimate was made with."""
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self.controller.check(201 * MB, expansion_factor=4)
+        self.assertIn("limit: 50 MB", str(ctx.exception))
+    
+    def test_budget_is_released(self):
+        """Test that acquired memory is returned to the budget on release."""
+        self.assertTrue(self.controller.try_acquire(60 * MB, 'first'))
+        self.assertEqual(self.controller.stats()['in_use_bytes'], 60 * MB)
+        self.assertFalse(self.controller.try_acquire(60 * MB, 'second'))
+        self.assertEqual(self.controller.stats()['waiting'], 1)
+        
+        self.controller.release(60 * MB)
+        self.assertEqual(self.controller.stats()['in_use_bytes'], 0)
+        self.assertTrue(self.controller.try_acquire(60 * MB, 'second'))
+        self.assertEqual(self.controller.stats()['waiting'], 0)
+    
+    def test_oversized_job_runs_alone(self):
+        """Test that a job larger than the budget is admitted when nothing else runs."""
+        self.assertTrue(self.controller.try_acquire(150 * MB, 'large'))
+        self.assertEqual(self.controller.stats()['running'], 1)
+        self.assertFalse(self.controller.try_acquire(10 * MB, 'small'))
+    
+    def test_empty_estimate_always_fits(self):
+        """Test that jobs without a memory estimate are never held back."""
+        self.assertTrue(self.controller.try_acquire(150 * MB, 'large'))
+        self.assertTrue(self.controller.try_acquire(0, 'empty'))
+        self.assertEqual(self.controller.stats()['running'], 2)
+    
+    def test_withdrawn_waiter_drops_reservation(self):
+        """Test that an abandoned waiter no longer holds back other jobs."""
+        self.assertTrue(self.controller.try_acquire(40 * MB, 'hold'))
+        self.assertFalse(self.controller.try_acquire(90 * MB, 'large'))
+        self.assertFalse(self.controller.try_acquire(50 * MB, 'small'))
+        
+        self.controller.withdraw('large')
+        self.assertTrue(self.controller.try_acquire(50 * MB, 'small'))
+        self.assertEqual(self.controller.stats()['waiting'], 0)
+    
+    def test_oldest_waiter_is_not_starved(self):
+        """Test that small jobs arriving later do not overtake a waiting large job."""
+        self.assertTrue(self.controller.try_acquire(40 * MB, 'hold'))
+        self.assertFalse(self.controller.try_acquire(90 * MB, 'large'))
+        
+        # 40 + 50 would fit the budget, but not next to the 90 MB reserved for the large job
+        self.assertFalse(self.controller.try_acquire(50 * MB, 'small'))
+        self.controller.release(40 * MB)
+        self.assertFalse(self.controller.try_acquire(50 * MB, 'small'))
+        self.assertTrue(self.controller.try_acquire(90 * MB, 'large'))
+    
+    def test_small_job_fits_next_to_reservation(self):
+        """Test that a job fitting beside the oldest waiter's reservation still starts."""
+        self.assertTrue(self.controller.try_acquire(50 * MB, 'first'))
+        self.assertTrue(self.controller.try_acquire(20 * MB, 'second'))
+        self.assertFalse(self.controller.try_acquire(60 * MB, 'large'))
+        self.controller.release(50 * MB)
+        
+        # 20 MB in use and 60 MB reserved leave room for 20 MB more
+        self.assertFalse(self.controller.try_acquire(30 * MB, 'medium'))
+        self.assertTrue(self.controller.try_acquire(10 * MB, 'small'))
+    
+    def test_concurrent_acquire_and_release(self):
+        """Test that the accounting stays consistent across threads."""
+        def run():
+            for _ in range(200):
+                ticket = object()
+                while not self.controller.try_acquire(30 * MB, ticket):
+                    time.sleep(0)
+                self.controller.release(30 * MB)
+        
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.controller.stats(), {
+            'budget_bytes': 100 * MB, 'in_use_bytes': 0, 'running': 0, 'waiting': 0
+        })
+
+
+class TestBotAdmission(unittest.TestCase):
+    
+    def test_bot_rejects_oversized_file(self):
+        """Test that the bot replies with an error instead of processing a huge file."""
+        env = {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test', 'CSV_BOT_MAX_JOB_MEMORY_MB': '60'}
+        with patch.dict('os.environ', env):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.process_csv_files = MagicMock()
+                    bot.send_error_message = MagicMock()
+                    
+                    event = {
+                        'channel': 'C123456',
+                        'files': [{'id': 'F1', 'name': 'big.csv', 'mimetype': 'text/csv', 'size': 20 * MB}]
+                    }
+                    bot.handle_message_with_files(event)
+                    
+                    bot.process_csv_files.assert_not_called()
+                    bot.send_error_message.assert_called_once_with(
+                        'C123456', 'File is too large to process (limit: 10 MB)'
+                    )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import json
+import unittest
+import urllib.error
+import urllib.request
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import requests
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from slackbot_poc.downloader import DownloadError, SlackFileDownloader, is_service_failure
+from slackbot_poc.health import HealthServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a breaker that opens after two failures."""
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=self.clock)
+    
+    def fail(self):
+        with self.assertRaises(RuntimeError):
+            with self.breaker.guard():
+                raise RuntimeError("boom")
+    
+    def test_opens_after_consecutive_failures(self):
+        """Test that the breaker opens and then rejects calls without running them."""
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        
+        called = MagicMock()
+        with self.assertRaises(CircuitOpen):
+            with self.breaker.guard():
+                called()
+        called.assert_not_called()
+    
+    def test_success_resets_failures(self):
+        """Test that only consecutive failures count."""
+        self.fail()
+        with self.breaker.guard():
+            pass
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+    
+    def test_half_open_trial(self):
+        """Test that one trial call is allowed after the reset timeout."""
+        self.fail()
+        self.fail()
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        
+        self.clock.now = 20
+        with self.breaker.guard():
+            # Other calls are rejected while the trial runs
+            with self.assertRaises(CircuitOpen):
+                with self.breaker.guard():
+                    pass
+        self.assertEqual(self.breaker.snapshot(), {"state": CLOSED, "failures": 0})
+    
+    def test_ignored_errors(self):
+        """Test that errors rejected by is_failure do not open the breaker."""
+        self.breaker.is_failure = lambda error: not isinstance(error, RuntimeError)
+        self.fail()
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+class TestDownloaderBreaker(unittest.TestCase):
+    
+    def test_service_failures(self):
+        """Test which errors count as a degraded file service."""
+        self.assertTrue(is_service_failure(DownloadError("x", status_code=503)))
+        self.assertTrue(is_service_failure(DownloadError("x", status_code=429)))
+        self.assertTrue(is_service_failure(requests.Timeout()))
+        self.assertFalse(is_service_failure(DownloadError("x", status_code=404)))
+        self.assertFalse(is_service_failure(ValueError()))
+    
+    def test_downloads_fail_fast_when_open(self):
+        """Test that downloads stop hitting the network once the breaker opens."""
+        downloader = SlackFileDownloader(MagicMock(), 'xoxb-test', timeout=5)
+        downloader.breaker.failure_threshold = 2
+        downloader.session = MagicMock()
+        downloader.session.get.side_effect = requests.ConnectTimeout()
+        file = {'id': 'F1', 'name': 'a.csv', 'url_private': 'https://files.slack.com/a.csv'}
+        
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectTimeout):
+                downloader.download(file)
+        with self.assertRaises(CircuitOpen):
+            downloader.download(file)
+        self.assertEqual(downloader.session.get.call_count, 2)
+
+
+class TestDegradedJobs(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a bot with mocked Slack clients."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    self.bot = slack_bot.SlackCSVBot()
+        self.file = {'id': 'F1', 'name': 'a.csv', 'size': 10}
+    
+    def open_breaker(self, breaker):
+        for _ in range(breaker.failure_threshold):
+            with self.assertRaises(TimeoutError):
+                with breaker.guard():
+                    raise TimeoutError()
+    
+    def test_job_rejected_while_downloads_degraded(self):
+        """Test that jobs fail fast with a degraded message when the download breaker is open."""
+        self.open_breaker(self.bot.downloader.breaker)
+        self.bot.process_csv_files = MagicMock()
+        
+        self.bot.handle_message_with_files({'channel': 'C1', 'files': [self.file]})
+        
+        self.bot.process_csv_files.assert_not_called()
+        self.bot.replies.flush()
+        self.bot.client.chat_postMessage.assert_called_once_with(channel='C1', text=slack_bot.DEGRADED_MESSAGE)
+    
+    def test_upload_degraded(self):
+        """Test that uploads are skipped with a degraded message when the upload breaker is open."""
+        self.open_breaker(self.bot.upload_breaker)
+        self.bot.client.files_upload_v2.reset_mock()
+        
+        self.bot.upload_processed_files('C1', ['a\n2\n'], [self.file])
+        
+        self.bot.client.files_upload_v2.assert_not_called()
+        self.bot.replies.flush()
+        self.bot.client.chat_postMessage.assert_called_once_with(channel='C1', text=slack_bot.DEGRADED_MESSAGE)
+    
+    def test_health_endpoints(self):
+        """Test the liveness and readiness endpoints."""
+        server = HealthServer(('127.0.0.1', 0), self.bot.health)
+        server.start()
+        base = f"http://127.0.0.1:{server.port}"
+        try:
+            with urllib.request.urlopen(base + "/healthz") as response:
+                self.assertEqual(json.load(response), {"status": "ok"})
+            
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                urllib.request.urlopen(base + "/readyz")
+            self.assertEqual(cm.exception.code, 503)
+            
+            self.bot.running = True
+            self.open_breaker(self.bot.upload_breaker)
+            with urllib.request.urlopen(base + "/readyz") as response:
+                report = json.load(response)
+            self.assertTrue(report["ready"])
+            self.assertTrue(report["degraded"])
+            self.assertEqual(report["breakers"]["files.upload"]["state"], OPEN)
+            self.assertEqual(report["breakers"]["files.download"]["state"], CLOSED)
+            self.assertEqual(report["queue_depth"], 0)
+            self.assertEqual(report["saturation"], 0)
+            self.assertEqual(report["channels"], {})
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+import os
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.admission import MB
+from slackbot_poc.config import ConfigError, Settings, load_settings, parse_priority_channels
+
+
+class TestLoadSettings(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a scratch directory for config files."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+    
+    def write(self, name, content):
+        """Write a file in the scratch directory and return its path."""
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+    
+    def test_defaults(self):
+        """Test that defaults are used when nothing is configured."""
+        settings = load_settings(env_file=None, environ={})
+        self.assertEqual(settings, Settings())
+    
+    def test_environment_values(self):
+        """Test reading and converting environment variables."""
+        settings = load_settings(env_file=None, environ={
+            'SLACK_BOT_TOKEN': 'xoxb-1',
+            'CSV_BOT_WORKERS': '4',
+            'CSV_BOT_DRAIN_TIMEOUT': '12.5',
+            'CSV_BOT_PRIORITY_CHANNELS': 'C1:3',
+        })
+        self.assertEqual(settings.slack_bot_token, 'xoxb-1')
+        self.assertEqual(settings.workers, 4)
+        self.assertEqual(settings.drain_timeout, 12.5)
+        self.assertEqual(settings.priority_channels, {'C1': 3})
+    
+    def test_precedence(self):
+        """Test that the environment beats .env, which beats the TOML file."""
+        config = self.write('bot.toml', 'workers = 2\nchannel_concurrency = 5\npreview_rows = 7\n'
+                                        '[priority_channels]\nC9 = 4\n')
+        env_file = self.write('.env', 'CSV_BOT_WORKERS=3\nCSV_BOT_CHANNEL_CONCURRENCY=6\n')
+        settings = load_settings(config_file=config, env_file=env_file, environ={'CSV_BOT_WORKERS': '9'})
+        self.assertEqual(settings.workers, 9)
+        self.assertEqual(settings.channel_concurrency, 6)
+        self.assertEqual(settings.preview_rows, 7)
+        self.assertEqual(settings.priority_channels, {'C9': 4})
+        self.assertEqual(settings.config_file, config)
+    
+    def test_config_file_from_environment(self):
+        """Test locating the TOML file through CSV_BOT_CONFIG."""
+        config = self.write('bot.toml', 'preview_rows = 3\n')
+        settings = load_settings(env_file=None, environ={'CSV_BOT_CONFIG': config})
+        self.assertEqual(settings.preview_rows, 3)
+    
+    def test_load_does_not_modify_environment(self):
+        """Test that .env values are not written into os.environ."""
+        env_file = self.write('.env', 'CSV_BOT_TEST_ONLY_SETTING=1\nCSV_BOT_WORKERS=3\n')
+        self.assertEqual(load_settings(env_file=env_file, environ={}).workers, 3)
+        self.assertNotIn('CSV_BOT_TEST_ONLY_SETTING', os.environ)
+    
+    def test_env_file_found_in_parent_directory(self):
+        """Test that .env is found when the bot starts in a subdirectory, as load_dotenv() did."""
+        self.write('.env', 'CSV_BOT_WORKERS=3\n')
+        subdir = os.path.join(self.tmpdir.name, 'nested', 'deeper')
+        os.makedirs(subdir)
+        cwd = os.getcwd()
+        os.chdir(subdir)
+        self.addCleanup(os.chdir, cwd)
+        self.assertEqual(load_settings(environ={}).workers, 3)
+    
+    def test_invalid_values(self):
+        """Test that invalid values raise ConfigError."""
+        with self.assertRaises(ConfigError):
+            load_settings(env_file=None, environ={'CSV_BOT_WORKERS': 'many'})
+        with self.assertRaises(ConfigError) as ctx:
+            load_settings(env_file=None, environ={'CSV_BOT_WORKERS': '0', 'CSV_BOT_DRAIN_TIMEOUT': '-1'})
+        self.assertIn('workers', str(ctx.exception))
+        self.assertIn('drain_timeout', str(ctx.exception))
+    
+    def test_require_tokens(self):
+        """Test that missing Slack tokens are reported by their variable names."""
+        with self.assertRaises(ConfigError) as ctx:
+            Settings(slack_bot_token='xoxb-1').require_tokens()
+        self.assertIn('SLACK_APP_TOKEN', str(ctx.exception))
+        self.assertNotIn('SLACK_BOT_TOKEN', str(ctx.exception))
+        settings = Settings(slack_bot_token='xoxb-1', slack_app_token='xapp-1')
+        self.assertIs(settings.require_tokens(), settings)
+    
+    def test_unknown_file_settings(self):
+        """Test that typos in the TOML file are reported."""
+        config = self.write('bot.toml', 'wokers = 2\n')
+        with self.assertRaises(ConfigError):
+            load_settings(config_file=config, env_file=None, environ={})
+    
+    def test_parse_priority_channels(self):
+        """Test parsing priority channel weights."""
+        self.assertEqual(parse_priority_channels('C1:3, C2'), {'C1': 3, 'C2': 2})
+        self.assertEqual(parse_priority_channels(''), {})
+
+
+class TestSettingsReload(unittest.TestCase):
+    
+    def make_bot(self, settings):
+        """Create a bot with mocked Slack clients, filling in tokens the settings leave out."""
+        settings = replace(
+            settings,
+            slack_bot_token=settings.slack_bot_token or 'xoxb-test',
+            slack_app_token=settings.slack_app_token or 'xapp-test',
+        )
+        with patch('slackbot_poc.bot.WebClient'):
+            with patch('slackbot_poc.bot.SocketModeClient'):
+                return slack_bot.SlackCSVBot(settings)
+    
+    def test_bot_requires_tokens(self):
+        """Test that a bot is not built without both Slack tokens."""
+        with patch('slackbot_poc.bot.WebClient'):
+            with patch('slackbot_poc.bot.SocketModeClient'):
+                with self.assertRaises(ConfigError):
+                    slack_bot.SlackCSVBot(Settings(slack_bot_token='xoxb-test'))
+    
+    def test_settings_are_applied(self):
+        """Test that settings reach the bot's components."""
+        bot = self.make_bot(Settings(workers=3, channel_concurrency=1, memory_budget_mb=10, download_timeout=7))
+        self.assertEqual(bot.scheduler.workers, 3)
+        self.assertEqual(bot.scheduler.channel_limit, 1)
+        self.assertEqual(bot.admission.budget_bytes, 10 * MB)
+        self.assertEqual(bot.downloader.timeout, 7)
+    
+    def test_reload_applies_tunables_only(self):
+        """Test that reload changes tunables but keeps settings that need a restart."""
+        bot = self.make_bot(Settings(slack_bot_token='old', workers=2))
+        new = Settings(slack_bot_token='new', workers=5, preview_rows=3)
+        with patch('slackbot_poc.bot.load_settings', return_value=new):
+            bot.reload_settings()
+        self.assertEqual(bot.scheduler.workers, 5)
+        self.assertEqual(bot.preview_rows, 3)
+        self.assertEqual(bot.settings.slack_bot_token, 'old')
+    
+    def test_reload_keeps_settings_on_error(self):
+        """Test that an invalid reload leaves the running settings alone."""
+        bot = self.make_bot(Settings(workers=2))
+        with patch('slackbot_poc.bot.load_settings', side_effect=ConfigError('bad')):
+            bot.reload_settings()
+        self.assertEqual(bot.scheduler.workers, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
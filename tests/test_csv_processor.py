@@ -5,7 +5,7 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from slackbot_poc.csv_processor import validate_csv_format, check_comma_separation, process_csv_files, format_results_for_slack
+from slackbot_poc.csv_processor import validate_csv_format, check_comma_separation, process_csv_files, process_csv_files_tolerant, preview_csv, format_results_for_slack
 
 
 class TestCSVProcessor(unittest.TestCase):
@@ -90,6 +90,56 @@ class TestCSVProcessor(unittest.TestCase):
         self.assertIn("**File 2:**", formatted)
         self.assertIn("Alice,50", formatted)
         self.assertIn("Bob,170", formatted)
+    
+    def test_preview_csv_first_rows(self):
+        """Test that preview only processes the requested number of rows."""
+        result = preview_csv(self.valid_csv, 1)
+        self.assertEqual(result, "name,age,score\nAlice,50,200\n")
+    
+    def test_preview_csv_invalid(self):
+        """Test that preview returns None for unusable content."""
+        self.assertIsNone(preview_csv(self.semicolon_csv, 5))
+        self.assertIsNone(preview_csv(self.invalid_csv, 5))
+    
+    def test_format_results_for_slack_truncated(self):
+        """Test that long results are truncated to fit the message limit."""
+        result = "n\n" + "\n".join(str(i) for i in range(1000))
+        formatted = format_results_for_slack([result, result], max_length=500)
+        self.assertLessEqual(len(formatted), 500)
+        self.assertEqual(formatted.count("... (truncated)"), 2)
+        self.assertIn("**File 2:**", formatted)
+        self.assertTrue(formatted.endswith("```"))
+    
+    def test_format_results_for_slack_short_not_truncated(self):
+        """Test that short results are left untouched when a limit is given."""
+        results = ["name,age\nAlice,50"]
+        self.assertEqual(format_results_for_slack(results, max_length=4000), format_results_for_slack(results))
+    
+    def test_tolerant_clean_file_matches_strict(self):
+        """Test that tolerant mode produces the same output for clean files."""
+        result = process_csv_files_tolerant([self.valid_csv, self.mixed_types_csv])
+        self.assertEqual([r.content for r in result], process_csv_files([self.valid_csv, self.mixed_types_csv]))
+        self.assertTrue(all(r.ok and r.quarantine is None for r in result))
+    
+    def test_tolerant_quarantines_bad_rows(self):
+        """Test that rows with too many fields are skipped and quarantined."""
+        bad_csv = b"name,age\nAlice,25\nBob,30,extra\nCarol,40\nDan,1,2,3"
+        self.assertIsInstance(process_csv_files([bad_csv]), str)
+        
+        result = process_csv_files_tolerant([bad_csv])[0]
+        self.assertTrue(result.ok)
+        self.assertEqual(result.content, "name,age\nAlice,50\nCarol,80\n")
+        self.assertEqual(result.bad_rows, 2)
+        self.assertEqual(result.quarantine, "line,name,age\n3,Bob,30,extra\n5,Dan,1,2,3\n")
+    
+    def test_tolerant_files_fail_independently(self):
+        """Test that one bad file does not discard the others."""
+        result = process_csv_files_tolerant([self.semicolon_csv, self.valid_csv, self.invalid_csv, b""])
+        self.assertEqual(result[0].error, "Please send csv file with comma(,).")
+        self.assertTrue(result[1].ok)
+        self.assertIn("Alice,50,200", result[1].content)
+        self.assertEqual(result[2].error, "Please send csv file")
+        self.assertEqual(result[3].error, "Please send csv file")
 
 
 if __name__ == '__main__':
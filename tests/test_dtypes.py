@@ -0,0 +1,119 @@
+import unittest
+import sys
+import warnings
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.csv_processor import process_csv_files, process_csv_files_tolerant
+from slackbot_poc.dtypes import HAS_PYARROW, compact_dtypes, read_csv_compact
+from slackbot_poc.transforms import apply_transforms, parse_transforms
+
+
+SAMPLES = [
+    b"name,age,city\nAlice,25,Tokyo\nBob,30,Tokyo\nCarol,127,Osaka\nDan,-128,Tokyo\n",
+    b'id,note,score\n1,"a, ""quoted""\nvalue",1.5\n2,,\n3,plain,2.25\n',
+    b"a,a,b\nx,1,2\nx,2,\ny,3,4\n",
+    b"\xef\xbb\xbfbig,small\n9223372036854775807,1\n-9223372036854775808,2\n",
+    b"flag,count\nTrue,1\nFalse,2\n",
+    b"a,b\r\n1,2\r\n3,4\r\n",
+]
+
+
+class TestCompactParsing(unittest.TestCase):
+    
+    def test_output_identical(self):
+        """Test that compact parsing produces byte-identical output."""
+        for transforms in (None, parse_transforms("scale=3 add=1"), parse_transforms("abs round=1")):
+            for sample in SAMPLES:
+                with self.subTest(sample=sample, transforms=transforms):
+                    self.assertEqual(
+                        process_csv_files([sample], transforms, compact=True),
+                        process_csv_files([sample], transforms)
+                    )
+    
+    def test_numbers_after_the_sample_identical(self):
+        """Test that a column that is text in the sample but numeric further down keeps its output."""
+        mixed = (
+            b"a,b\n"
+            + b"".join(b"x%d,%d\n" % (i % 3, i) for i in range(1000))
+            + b"".join(b"1.50,%d\n" % i for i in range(400000))
+        )
+        booleans = b"a\n" + b"x\n" * 1000 + b"true\n" * 300000
+        for sample in (mixed, booleans):
+            with self.subTest(sample=sample[:20]):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", pd.errors.DtypeWarning)
+                    self.assertEqual(process_csv_files([sample], compact=True), process_csv_files([sample]))
+    
+    def test_dtypes_are_compact(self):
+        """Test that repetitive text becomes categorical and integers are downcast."""
+        expected = {0: "string[pyarrow]", 2: "category"} if HAS_PYARROW else {2: "category"}
+        self.assertEqual(compact_dtypes(SAMPLES[0]), expected)
+        df = read_csv_compact(SAMPLES[0])
+        self.assertEqual(str(df['city'].dtype), 'category')
+        self.assertEqual(str(df['age'].dtype), 'int8')
+    
+    def test_doubling_widens_small_integers(self):
+        """Test that doubling a downcast column does not overflow."""
+        df = apply_transforms(read_csv_compact(SAMPLES[0]))
+        self.assertEqual(df['age'].tolist(), [50, 60, 254, -256])
+        self.assertEqual(str(df['age'].dtype), 'int64')
+    
+    def test_errors_identical(self):
+        """Test that invalid files get the same messages in compact mode."""
+        invalid = [b"", b"   \n", b"\xff\xfe\x00", b"a;b\n1;2\n", b"a,b\n1,2\n1,2,3\n"]
+        for sample in invalid:
+            with self.subTest(sample=sample):
+                self.assertEqual(process_csv_files([sample], compact=True), process_csv_files([sample]))
+        self.assertEqual(
+            process_csv_files([SAMPLES[0], b"a;b\n1;2\n"], compact=True),
+            "Please send csv file with comma(,)."
+        )
+    
+    def test_tolerant_identical(self):
+        """Test that the tolerant path, including quarantine, matches in compact mode."""
+        files = SAMPLES + [b"a,b\n1,2\n3,4,5\n6,7\n", b"", b"a;b\n1;2\n"]
+        self.assertEqual(
+            process_csv_files_tolerant(files, compact=True),
+            process_csv_files_tolerant(files)
+        )
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestArrowStrings(unittest.TestCase):
+    
+    def test_unique_text_uses_arrow_strings(self):
+        """Test that text columns with mostly unique values are read as Arrow strings."""
+        sample = b"id,name\n" + b"".join(b"%d,name %d\n" % (i, i) for i in range(100))
+        self.assertEqual(compact_dtypes(sample), {1: "string[pyarrow]"})
+        self.assertEqual(str(read_csv_compact(sample)['name'].dtype), 'string')
+    
+    def test_output_identical(self):
+        """Test that Arrow-backed strings give byte-identical output."""
+        unique = b"id,name,score\n" + b"".join(b'%d,"name, %d",1.50\n' % (i, i) for i in range(100))
+        for sample in SAMPLES + [unique]:
+            with self.subTest(sample=sample):
+                self.assertEqual(process_csv_files([sample], compact=True), process_csv_files([sample]))
+
+
+class TestCompactSettings(unittest.TestCase):
+    
+    def test_admission_uses_compact_factor(self):
+        """Test that compact parsing admits larger files under the same budget."""
+        environ = {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test', 'CSV_BOT_COMPACT_DTYPES': 'true'}
+        with patch.dict('os.environ', environ):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+        self.assertTrue(bot.settings.compact_dtypes)
+        self.assertEqual(bot.estimate_job([{'id': 'F1', 'name': 'a.csv', 'size': 100}]), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
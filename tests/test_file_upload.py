@@ -12,7 +12,7 @@ from unittest.mock import patch, MagicMock, call
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import slackbot_poc.bot as slack_bot
-from slackbot_poc.csv_processor import process_csv_files
+from slackbot_poc.csv_processor import process_csv_files, FileResult
 
 
 class TestFileUpload(unittest.TestCase):
@@ -130,6 +130,70 @@ class TestFileUpload(unittest.TestCase):
         
         print("✓ Upload error handling test passed")
     
+    def test_partial_failure_uploads_successes(self):
+        """Test that files that processed are uploaded even when others fail."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.upload_processed_files = MagicMock()
+                    bot.send_error_message = MagicMock()
+                    bot.client.files_upload_v2 = MagicMock()
+                    
+                    original_files = [
+                        {'id': 'F1', 'name': 'good.csv'},
+                        {'id': 'F2', 'name': 'bad.csv'},
+                    ]
+                    results = [
+                        FileResult(content='a\n2\n', quarantine='line,a\n3,1,2\n', bad_rows=1),
+                        FileResult(error='Please send csv file with comma(,).'),
+                    ]
+                    
+                    bot.reply_with_file_results('C123456', results, original_files)
+                    
+                    bot.upload_processed_files.assert_called_once_with('C123456', ['a\n2\n'], [original_files[0]], None)
+                    bot.client.files_upload_v2.assert_called_once_with(
+                        channel='C123456',
+                        content='line,a\n3,1,2\n',
+                        filename='quarantine_good.csv',
+                        title='Skipped rows from good.csv',
+                        initial_comment='⚠️ Skipped 1 malformed rows in good.csv'
+                    )
+                    bot.send_error_message.assert_called_once_with(
+                        'C123456', 'bad.csv: Please send csv file with comma(,).'
+                    )
+    
+    def test_single_file_error_message_unchanged(self):
+        """Test that a single failing file still gets the plain error message."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.downloader = MagicMock()
+                    bot.downloader.download.return_value = b'name;age\nAlice;25'
+                    bot.send_error_message = MagicMock()
+                    bot.upload_processed_files = MagicMock()
+                    
+                    bot.process_csv_files('C123456', [self.mock_file])
+                    
+                    bot.upload_processed_files.assert_not_called()
+                    bot.send_error_message.assert_called_once_with('C123456', 'Please send csv file with comma(,).')
+    
+    def test_upload_with_transform_description(self):
+        """Test that custom transforms are described in the upload comment."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.client.files_upload_v2 = MagicMock()
+                    
+                    bot.upload_processed_files('C123456', self.expected_result, [self.mock_file], 'multiplied by 3')
+                    
+                    self.assertEqual(
+                        bot.client.files_upload_v2.call_args[1]['initial_comment'],
+                        'CSV file processed - multiplied by 3 📊'
+                    )
+    
     def test_csv_processing_integration(self):
         """Test integration between CSV processing and file upload."""
         print("Testing CSV processing integration...")
@@ -0,0 +1,109 @@
+import unittest
+import io
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from slackbot_poc.logging_config import JsonFormatter, SamplingFilter, configure_logging, shutdown_logging
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    """Create a log record with extra attributes."""
+    record = logging.LogRecord('slackbot_poc.bot', level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter(unittest.TestCase):
+    
+    def test_context_fields(self):
+        """Test that structured context is emitted as JSON fields."""
+        record = make_record("Job finished: %d files", 2, job_id='abc', channel='C1',
+                             timings_ms={'download': 1.5}, unrelated='x')
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual(payload['message'], 'Job finished: 2 files')
+        self.assertEqual(payload['level'], 'INFO')
+        self.assertEqual(payload['job_id'], 'abc')
+        self.assertEqual(payload['channel'], 'C1')
+        self.assertEqual(payload['timings_ms'], {'download': 1.5})
+        self.assertNotIn('unrelated', payload)
+        self.assertNotIn('file_id', payload)
+
+
+class TestSamplingFilter(unittest.TestCase):
+    
+    def test_samples_marked_records(self):
+        """Test that only every Nth sampled record passes."""
+        sampler = SamplingFilter()
+        passed = [sampler.filter(make_record("Downloaded file", sample_every=3)) for _ in range(7)]
+        self.assertEqual(passed, [True, False, False, True, False, False, True])
+    
+    def test_unmarked_and_warning_records_pass(self):
+        """Test that normal records and warnings are never dropped."""
+        sampler = SamplingFilter()
+        self.assertTrue(all(sampler.filter(make_record("Job finished")) for _ in range(5)))
+        self.assertTrue(all(
+            sampler.filter(make_record("Slow", level=logging.WARNING, sample_every=100)) for _ in range(5)
+        ))
+
+
+class TestConfigureLogging(unittest.TestCase):
+    
+    def setUp(self):
+        """Remember the root logger configuration."""
+        root = logging.getLogger()
+        self.saved = (list(root.handlers), root.level)
+    
+    def tearDown(self):
+        """Restore the root logger configuration."""
+        shutdown_logging()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self.saved[0]:
+            root.addHandler(handler)
+        root.setLevel(self.saved[1])
+    
+    def test_records_are_written_by_listener(self):
+        """Test that records go through the queue and are formatted on the listener thread."""
+        stream = io.StringIO()
+        formatted_on = []
+        
+        class Probe:
+            def __str__(self):
+                formatted_on.append(threading.current_thread().name)
+                return 'probe'
+        
+        with patch('sys.stderr', stream):
+            configure_logging('INFO', 'json')
+        logging.getLogger('slackbot_poc.test').info("value=%s", Probe(), extra={'job_id': 'j1'})
+        logging.getLogger('slackbot_poc.test').debug("hidden")
+        shutdown_logging()
+        
+        lines = stream.getvalue().strip().splitlines()
+        self.assertEqual(len(lines), 1)
+        payload = json.loads(lines[0])
+        self.assertEqual(payload['message'], 'value=probe')
+        self.assertEqual(payload['job_id'], 'j1')
+        self.assertEqual(len(formatted_on), 1)
+        self.assertNotEqual(formatted_on[0], threading.current_thread().name)
+    
+    def test_text_format(self):
+        """Test the plain text output format."""
+        stream = io.StringIO()
+        with patch('sys.stderr', stream):
+            configure_logging('INFO', 'text')
+        logging.getLogger('slackbot_poc.test').warning("Rejected job: %s", 'too big')
+        shutdown_logging()
+        self.assertEqual(stream.getvalue().strip(), 'WARNING:slackbot_poc.test:Rejected job: too big')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import time
+from dataclasses import replace
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock, call
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.outbound import MessageCoalescer, TTLCache
+
+
+class TestMessageCoalescer(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a coalescer with a long window that tests flush by hand."""
+        self.post = MagicMock()
+        self.coalescer = MessageCoalescer(self.post, window=60, max_length=30)
+    
+    def tearDown(self):
+        self.coalescer.flush()
+    
+    def test_merges_per_channel_and_thread(self):
+        """Test that replies to the same channel or thread are merged, without duplicates."""
+        self.coalescer.send('C1', 'first')
+        self.coalescer.send('C1', 'second')
+        self.coalescer.send('C1', 'first')
+        self.coalescer.send('C2', 'other')
+        self.coalescer.send('C1', 'threaded', '123.456')
+        self.post.assert_not_called()
+        self.assertEqual(self.coalescer.pending(), 3)
+        
+        self.coalescer.flush()
+        self.post.assert_has_calls([
+            call('C1', 'first\nsecond', None),
+            call('C2', 'other', None),
+            call('C1', 'threaded', '123.456'),
+        ])
+        self.assertEqual(self.coalescer.pending(), 0)
+    
+    def test_splits_long_batches(self):
+        """Test that merged text is split to stay under the message limit."""
+        for text in ('a' * 20, 'b' * 20, 'c' * 5):
+            self.coalescer.send('C1', text)
+        self.coalescer.flush()
+        self.assertEqual([c[0][1] for c in self.post.call_args_list], ['a' * 20, 'b' * 20 + '\n' + 'c' * 5])
+    
+    def test_window_elapses(self):
+        """Test that a batch is posted once its window closes."""
+        self.coalescer.window = 0.05
+        self.coalescer.send('C1', 'hello')
+        self.coalescer.send('C1', 'world')
+        deadline = time.monotonic() + 5
+        while not self.post.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.post.assert_called_once_with('C1', 'hello\nworld', None)
+    
+    def test_no_window(self):
+        """Test that a window of 0 posts immediately."""
+        self.coalescer.window = 0
+        self.coalescer.send('C1', 'now')
+        self.post.assert_called_once_with('C1', 'now', None)
+
+
+class TestTTLCache(unittest.TestCase):
+    
+    def test_expiry_and_eviction(self):
+        """Test that keys are remembered for the TTL and evicted oldest first."""
+        now = [0.0]
+        cache = TTLCache(ttl=10, max_entries=2, clock=lambda: now[0])
+        self.assertFalse(cache.seen('a'))
+        self.assertTrue(cache.seen('a'))
+        now[0] = 10
+        self.assertFalse(cache.seen('a'))
+        cache.seen('b')
+        cache.seen('c')
+        self.assertFalse(cache.seen('a'))
+
+
+class TestBotReplies(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a bot with mocked Slack clients."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    self.bot = slack_bot.SlackCSVBot()
+    
+    def tearDown(self):
+        self.bot.replies.flush()
+    
+    def test_repeated_help_suppressed(self):
+        """Test that a user gets the help reply once per TTL, merged per channel."""
+        for user in ('U1', 'U1', 'U2'):
+            self.bot.handle_message_without_files({'channel': 'C1', 'user': user, 'text': 'hi'})
+        self.bot.replies.flush()
+        self.bot.client.chat_postMessage.assert_called_once_with(channel='C1', text='Please send csv file')
+    
+    def test_results_posted_in_thread(self):
+        """Test that per-file results and errors go to the thread of the user's message."""
+        self.bot.downloader = MagicMock()
+        self.bot.downloader.download.side_effect = [b'a,b\n1,2\n', b'a;b\n1;2\n']
+        files = [{'id': 'F1', 'name': 'good.csv'}, {'id': 'F2', 'name': 'bad.csv'}]
+        event = {'channel': 'C1', 'user': 'U1', 'ts': '111.222', 'files': files}
+        
+        self.bot.handle_message_with_files(event)
+        self.bot.replies.flush()
+        
+        self.bot.client.files_upload_v2.assert_called_once_with(
+            channel='C1',
+            content='a,b\n2,4\n',
+            filename='processed_good.csv',
+            title='Processed good.csv',
+            initial_comment='CSV file processed - integer columns have been doubled! 📊',
+            thread_ts='111.222'
+        )
+        self.bot.client.chat_postMessage.assert_called_once_with(
+            channel='C1', text='bad.csv: Please send csv file with comma(,).', thread_ts='111.222'
+        )
+    
+    def test_threaded_replies_disabled(self):
+        """Test that threading can be turned off."""
+        self.bot.settings = replace(self.bot.settings, threaded_replies=False)
+        self.assertIsNone(self.bot.reply_thread({'ts': '111.222'}))
+        self.bot.settings = replace(self.bot.settings, threaded_replies=True)
+        self.assertEqual(self.bot.reply_thread({'ts': '111.222', 'thread_ts': '100.000'}), '100.000')
+
+
+if __name__ == '__main__':
+    unittest.main()
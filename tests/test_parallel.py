@@ -0,0 +1,177 @@
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.csv_processor import FileResult, _process_one_tolerant, process_csv_files
+from slackbot_poc.parallel import PARALLEL_CHUNK_BYTES, process_csv_file_parallel, split_records
+from slackbot_poc.transforms import parse_transforms
+
+
+class TestSplitRecords(unittest.TestCase):
+    
+    def test_splits_at_newlines(self):
+        """Test that ranges cover the data and start at line boundaries."""
+        data = b"a,b\n" + b"".join(b"%d,%d\n" % (i, i) for i in range(100))
+        bounds = split_records(data, 4, start=4)
+        self.assertEqual(bounds[0], 4)
+        self.assertEqual(bounds[-1], len(data))
+        self.assertEqual(len(bounds), 5)
+        for bound in bounds[1:-1]:
+            self.assertEqual(data[bound - 1:bound], b"\n")
+    
+    def test_skips_newlines_inside_quotes(self):
+        """Test that a quoted field with newlines is never split."""
+        row = b'1,"line one\nline ""two""\nline three"\n'
+        data = b"a,b\n" + row * 50
+        bounds = split_records(data, 7, start=4)
+        self.assertGreater(len(bounds), 2)
+        for start, end in zip(bounds, bounds[1:]):
+            self.assertEqual((end - start) % len(row), 0)
+
+
+class TestParallelProcessing(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a temporary directory for input and output files."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.tmp.name, 'in.csv')
+        self.output = os.path.join(self.tmp.name, 'out.csv')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def process(self, data, transforms=None, **kwargs):
+        with open(self.input, 'wb') as f:
+            f.write(data)
+        with patch('slackbot_poc.parallel.PARALLEL_CHUNK_BYTES', 256):
+            result = process_csv_file_parallel(self.input, self.output, transforms, processes=2, **kwargs)
+        return result
+    
+    def read_output(self):
+        with open(self.output, encoding='utf-8', newline='') as f:
+            return f.read()
+    
+    def test_matches_serial_output(self):
+        """Test that parallel output equals the single-process result, including quoted fields."""
+        data = b"id,note,score\n" + b"".join(b'%d,"a, ""b""\nc",%d.5\n' % (i, i) for i in range(200))
+        transforms = parse_transforms("scale=3")
+        result = self.process(data, transforms)
+        self.assertTrue(result.ok)
+        self.assertEqual(self.read_output(), process_csv_files([data], parse_transforms("scale=3"))[0])
+    
+    def test_reparses_when_dtypes_disagree(self):
+        """Test that a blank value in one range does not change the result."""
+        rows = [b"%d,%d" % (i, i) for i in range(200)]
+        rows[150] = b"150,"
+        data = b"a,b\n" + b"\n".join(rows) + b"\n"
+        result = self.process(data)
+        self.assertTrue(result.ok)
+        self.assertEqual(self.read_output(), process_csv_files([data])[0])
+    
+    def test_text_in_one_range_keeps_numbers_as_written(self):
+        """Test that a column numeric in some ranges and text in others is read as text everywhere."""
+        rows = [b"%d,1.50" % i for i in range(200)]
+        rows[180] = b"180,unknown"
+        data = b"a,b\n" + b"\n".join(rows) + b"\n"
+        result = self.process(data)
+        self.assertTrue(result.ok)
+        self.assertEqual(self.read_output(), process_csv_files([data])[0])
+        self.assertIn("1.50", self.read_output())
+    
+    def test_malformed_rows_are_quarantined(self):
+        """Test that malformed rows are skipped and quarantined by the range that holds them."""
+        data = b"a,b\n" + b"1,2\n" * 100 + b"3,4,5\n" + b"6,7\n" * 100
+        result = self.process(data)
+        self.assertEqual(result.bad_rows, 1)
+        self.assertIsNone(result.content)
+        self.assertEqual(self.read_output(), "a,b\n" + "2,4\n" * 100 + "12,14\n" * 100)
+    
+    def test_quarantine_uses_file_line_numbers(self):
+        """Test that rows quarantined in different ranges keep their line numbers in the file."""
+        rows = [b"%d,%d" % (i, i) for i in range(300)]
+        rows[10] = b"10,1,2"
+        rows[250] = b"250,1,2"
+        data = b"a,b\n" + b"\n".join(rows) + b"\n"
+        result = self.process(data)
+        expected = _process_one_tolerant(data, 0)
+        self.assertEqual(result.bad_rows, 2)
+        self.assertEqual(result.quarantine, expected.quarantine)
+        self.assertEqual(self.read_output(), expected.content)
+    
+    def test_malformed_rows_fail_without_tolerance(self):
+        """Test that strict parsing reports malformed rows instead of reading the whole file."""
+        data = b"a,b\n" + b"1,2\n" * 100 + b"3,4,5\n" + b"6,7\n" * 100
+        self.assertEqual(self.process(data, tolerant=False).error, "Please send csv file")
+    
+    def test_invalid_file(self):
+        """Test that invalid files get the usual error."""
+        self.assertEqual(self.process(b"a;b\n1;2\n").error, "Please send csv file with comma(,).")
+        self.assertEqual(self.process(b"a;b\n1;2\n", tolerant=False).error, "Please send csv file with comma(,).")
+
+
+class TestLargeFileJobs(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a bot with mocked Slack clients and parallel parsing enabled."""
+        with patch.dict('os.environ', {
+            'SLACK_BOT_TOKEN': 'test',
+            'SLACK_APP_TOKEN': 'test',
+            'CSV_BOT_PARSE_PROCESSES': '4',
+            'CSV_BOT_PARALLEL_MIN_SIZE_MB': '100',
+        }):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    self.bot = slack_bot.SlackCSVBot()
+        self.big_file = {'id': 'F1', 'name': 'big.csv', 'size': 2048 * 1024 * 1024}
+    
+    def test_use_parallel(self):
+        """Test that only a single large file takes the parallel path."""
+        self.assertTrue(self.bot.use_parallel([self.big_file]))
+        self.assertFalse(self.bot.use_parallel([self.big_file, self.big_file]))
+        self.assertFalse(self.bot.use_parallel([{'id': 'F2', 'name': 'small.csv', 'size': 1024}]))
+    
+    def test_estimate_counts_ranges_in_flight(self):
+        """Test that a parallel job is admitted by the ranges held at once, not the file size."""
+        estimate = self.bot.estimate_job([self.big_file])
+        self.assertEqual(estimate, 4 * PARALLEL_CHUNK_BYTES * 6)
+    
+    def test_processes_capped_by_hard_cap(self):
+        """Test that the ranges in flight never exceed the hard cap with the default settings."""
+        self.bot.parse_processes = 16
+        processes = self.bot.parallel_processes()
+        self.assertGreater(processes, 1)
+        self.assertLessEqual(processes * PARALLEL_CHUNK_BYTES * 6, self.bot.admission.hard_cap_bytes)
+        self.assertLessEqual(self.bot.estimate_job([self.big_file]), self.bot.admission.hard_cap_bytes)
+        self.assertTrue(self.bot.use_parallel([self.big_file]))
+    
+    @patch('slackbot_poc.bot.process_csv_file_parallel')
+    def test_large_file_uploaded_from_disk(self, mock_parallel):
+        """Test that the result is uploaded from a file path."""
+        self.bot.downloader = MagicMock()
+        self.bot.downloader.download_to_file.return_value = 10
+        mock_parallel.return_value = FileResult()
+        
+        self.bot.process_csv_files('C1', [self.big_file], 'job1')
+        
+        input_path, output_path = mock_parallel.call_args[0][:2]
+        self.bot.downloader.download_to_file.assert_called_once_with(self.big_file, input_path)
+        self.assertEqual(mock_parallel.call_args[1]['processes'], 4)
+        self.bot.client.files_upload_v2.assert_called_once_with(
+            channel='C1',
+            file=output_path,
+            filename='processed_big.csv',
+            title='Processed big.csv',
+            initial_comment='CSV file processed - integer columns have been doubled! 📊'
+        )
+        self.assertFalse(os.path.exists(output_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
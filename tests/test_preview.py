@@ -0,0 +1,175 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.downloader import SlackFileDownloader, DownloadError
+
+
+def fake_response(chunks, status_code=200):
+    """Create a streaming HTTP response returning the given chunks."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.iter_content.return_value = iter(chunks)
+    response.content = b"".join(chunks)
+    return response
+
+
+class TestSlackFileDownloader(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a downloader with a mocked HTTP session."""
+        self.downloader = SlackFileDownloader(MagicMock(), 'xoxb-test', timeout=5)
+        self.downloader.session = MagicMock()
+        self.file = {'id': 'F1', 'name': 'big.csv', 'url_private': 'https://files.slack.com/big.csv'}
+    
+    def test_download_uses_timeout_and_token(self):
+        """Test that downloads are authenticated and bounded by a timeout."""
+        self.downloader.session.get.return_value = fake_response([b'a,b\n1,2\n'])
+        self.assertEqual(self.downloader.download(self.file), b'a,b\n1,2\n')
+        _, kwargs = self.downloader.session.get.call_args
+        self.assertEqual(kwargs['headers'], {'Authorization': 'Bearer xoxb-test'})
+        self.assertEqual(kwargs['timeout'], 5)
+        self.downloader.client.files_info.assert_not_called()
+    
+    def test_download_looks_up_missing_url(self):
+        """Test that the URL is looked up when the event does not include it."""
+        self.downloader.client.files_info.return_value = {'file': {'url_private': 'https://files.slack.com/x'}}
+        self.downloader.session.get.return_value = fake_response([b'a\n'])
+        self.downloader.download({'id': 'F2', 'name': 'x.csv'})
+        self.assertEqual(self.downloader.session.get.call_args[0][0], 'https://files.slack.com/x')
+    
+    def test_download_error_status(self):
+        """Test that non-200 responses raise DownloadError."""
+        self.downloader.session.get.return_value = fake_response([], status_code=403)
+        with self.assertRaises(DownloadError):
+            self.downloader.download(self.file)
+    
+    def test_download_head_stops_early(self):
+        """Test that only the first lines are read from the stream."""
+        chunks = [b'a,b\n1,2\n3,', b'4\n5,6\n', b'7,8\n']
+        response = fake_response(chunks)
+        self.downloader.session.get.return_value = response
+        
+        head = self.downloader.download_head(self.file, max_lines=3)
+        
+        self.assertEqual(head, b'a,b\n1,2\n3,4')
+        self.assertTrue(self.downloader.session.get.call_args[1]['stream'])
+        response.close.assert_called_once()
+    
+    def test_download_head_small_file(self):
+        """Test that a file shorter than the head is returned whole."""
+        self.downloader.session.get.return_value = fake_response([b'a,b\n1,2'])
+        self.assertEqual(self.downloader.download_head(self.file, max_lines=10), b'a,b\n1,2')
+    
+    def test_download_head_byte_limit(self):
+        """Test that the byte limit drops the trailing partial line."""
+        self.downloader.session.get.return_value = fake_response([b'a,b\n1,2\n3,4' + b'5' * 100])
+        self.assertEqual(self.downloader.download_head(self.file, max_lines=10, max_bytes=50), b'a,b\n1,2')
+
+
+class TestBotPreview(unittest.TestCase):
+    
+    def make_bot(self):
+        """Create a bot with mocked Slack clients."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+        bot.client.chat_postMessage = MagicMock()
+        bot.downloader = MagicMock()
+        bot.scheduler = MagicMock()
+        return bot
+    
+    def test_preview_keyword_posts_inline(self):
+        """Test that the preview keyword posts the first rows before queueing the full job."""
+        bot = self.make_bot()
+        bot.preview_rows = 2
+        bot.downloader.download_head.return_value = b'name,age\nAlice,25\nBob,30'
+        event = {
+            'type': 'message', 'channel': 'C1', 'user': 'U1', 'text': 'Preview please',
+            'files': [{'id': 'F1', 'name': 'people.csv', 'size': 100}]
+        }
+        
+        bot.maybe_post_preview(event)
+        
+        bot.downloader.download_head.assert_called_once_with(event['files'][0], max_lines=3)
+        text = bot.client.chat_postMessage.call_args[1]['text']
+        self.assertIn('Preview of the first 2 rows', text)
+        self.assertIn('Alice,50', text)
+        self.assertIn('Bob,60', text)
+    
+    def test_large_file_triggers_preview(self):
+        """Test that a file over the size threshold is previewed without the keyword."""
+        bot = self.make_bot()
+        event = {'text': '', 'files': [{'name': 'big.csv', 'size': bot.preview_min_size}]}
+        self.assertTrue(bot.wants_preview(event, event['files']))
+        event['files'][0]['size'] = 10
+        self.assertFalse(bot.wants_preview(event, event['files']))
+        self.assertFalse(bot.wants_preview({'text': 'previews'}, event['files']))
+    
+    def test_no_preview_for_invalid_head(self):
+        """Test that nothing is posted when the head is not a valid CSV."""
+        bot = self.make_bot()
+        bot.downloader.download_head.return_value = b'name;age\nAlice;25'
+        bot.post_preview('C1', [{'id': 'F1', 'name': 'a.csv'}])
+        bot.client.chat_postMessage.assert_not_called()
+    
+    def test_process_request_queues_then_previews(self):
+        """Test that file messages are queued first and previewed off the listener thread."""
+        bot = self.make_bot()
+        calls = MagicMock()
+        bot.scheduler = calls.scheduler
+        bot.previews = calls.previews
+        req = MagicMock()
+        req.type = 'events_api'
+        req.payload = {'event': {'type': 'message', 'channel': 'C1', 'user': 'U1',
+                                 'files': [{'id': 'F1', 'name': 'a.csv'}]}}
+        bot.process_request(MagicMock(), req)
+        
+        self.assertEqual([name for name, _, _ in calls.mock_calls], ['scheduler.submit', 'previews.submit'])
+        self.assertEqual(bot.previews.submit.call_args[0], (bot.maybe_post_preview, req.payload['event']))
+    
+    def test_no_preview_for_rejected_or_degraded_jobs(self):
+        """Test that no preview is posted for a file over the size limit or while downloads fail."""
+        bot = self.make_bot()
+        bot.downloader.download_head.return_value = b'name,age\nAlice,25'
+        event = {
+            'type': 'message', 'channel': 'C1', 'user': 'U1', 'text': 'preview',
+            'files': [{'id': 'F1', 'name': 'huge.csv', 'size': 10 * 1024 ** 3}]
+        }
+        bot.maybe_post_preview(event)
+        
+        event['files'][0]['size'] = 100
+        with patch.object(bot, 'file_service_degraded', return_value=True):
+            bot.maybe_post_preview(event)
+        
+        bot.downloader.download_head.assert_not_called()
+        bot.client.chat_postMessage.assert_not_called()
+    
+    def test_process_request_during_drain(self):
+        """Test that an event racing with drain() is still queued without raising on the listener thread."""
+        bot = self.make_bot()
+        bot.previews.shutdown()
+        req = MagicMock()
+        req.type = 'events_api'
+        req.payload = {'event': {'type': 'message', 'channel': 'C1', 'user': 'U1',
+                                 'files': [{'id': 'F1', 'name': 'a.csv'}]}}
+        bot.process_request(MagicMock(), req)
+        bot.scheduler.submit.assert_called_once()
+    
+    def test_download_failure_message(self):
+        """Test the error reply when a download fails."""
+        bot = self.make_bot()
+        bot.send_error_message = MagicMock()
+        bot.downloader.download.side_effect = DownloadError("HTTP 404")
+        bot.process_csv_files('C1', [{'id': 'F1', 'name': 'a.csv'}])
+        bot.send_error_message.assert_called_once_with('C1', 'Failed to download CSV file')
+
+
+if __name__ == '__main__':
+    unittest.main()
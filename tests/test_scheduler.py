@@ -0,0 +1,346 @@
+import unittest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.admission import AdmissionController, MB
+from slackbot_poc.scheduler import FairScheduler
+
+
+class TestFairScheduler(unittest.TestCase):
+    
+    def run_jobs(self, scheduler, jobs):
+        """Queue (channel, user) jobs before starting and return the execution order."""
+        order = []
+        done = threading.Semaphore(0)
+        
+        def make_job(channel, user):
+            def job():
+                order.append((channel, user))
+                done.release()
+            return job
+        
+        for channel, user in jobs:
+            scheduler.submit(channel, user, make_job(channel, user))
+        scheduler.start()
+        for _ in jobs:
+            self.assertTrue(done.acquire(timeout=2))
+        scheduler.stop(timeout=2)
+        return order
+    
+    def test_round_robin_across_channels(self):
+        """Test that a flooding channel does not starve other channels."""
+        scheduler = FairScheduler(workers=1)
+        jobs = [('CFLOOD', 'U1')] * 4 + [('CQUIET', 'U2')] * 2
+        order = self.run_jobs(scheduler, jobs)
+        self.assertEqual([channel for channel, _ in order],
+                         ['CFLOOD', 'CQUIET', 'CFLOOD', 'CQUIET', 'CFLOOD', 'CFLOOD'])
+    
+    def test_priority_channel_weight(self):
+        """Test that priority channels get proportionally more turns."""
+        scheduler = FairScheduler(workers=1, priority_channels={'CPRIO': 2})
+        jobs = [('CPRIO', 'U1')] * 4 + [('CNORMAL', 'U2')] * 2
+        order = self.run_jobs(scheduler, jobs)
+        self.assertEqual([channel for channel, _ in order],
+                         ['CPRIO', 'CPRIO', 'CNORMAL', 'CPRIO', 'CPRIO', 'CNORMAL'])
+    
+    def test_round_robin_across_users(self):
+        """Test that users within a channel are served in turn."""
+        scheduler = FairScheduler(workers=1)
+        jobs = [('C1', 'U1')] * 3 + [('C1', 'U2')]
+        order = self.run_jobs(scheduler, jobs)
+        self.assertEqual([user for _, user in order], ['U1', 'U2', 'U1', 'U1'])
+    
+    def test_channel_concurrency_limit(self):
+        """Test that a channel cannot occupy more workers than its limit."""
+        scheduler = FairScheduler(workers=2, channel_limit=1)
+        release = threading.Event()
+        blocked_started = threading.Event()
+        other_ran = threading.Event()
+        second_ran = threading.Event()
+        
+        def blocking_job():
+            blocked_started.set()
+            release.wait(2)
+        
+        scheduler.submit('C1', 'U1', blocking_job)
+        scheduler.submit('C1', 'U1', second_ran.set)
+        scheduler.submit('C2', 'U2', other_ran.set)
+        scheduler.start()
+        
+        self.assertTrue(blocked_started.wait(2))
+        self.assertTrue(other_ran.wait(2))
+        self.assertFalse(second_ran.is_set())
+        release.set()
+        self.assertTrue(second_ran.wait(2))
+        scheduler.stop(timeout=2)
+    
+    def test_metrics_per_channel(self):
+        """Test that queue-wait metrics are reported per channel."""
+        scheduler = FairScheduler(workers=1)
+        self.run_jobs(scheduler, [('C1', 'U1'), ('C2', 'U2'), ('C1', 'U1')])
+        metrics = scheduler.metrics()
+        self.assertEqual(metrics['C1']['completed'], 2)
+        self.assertEqual(metrics['C2']['completed'], 1)
+        self.assertEqual(metrics['C1']['queued'], 0)
+        self.assertGreaterEqual(metrics['C1']['wait_max'], metrics['C1']['wait_avg'])
+    
+    def test_job_errors_do_not_kill_workers(self):
+        """Test that a failing job does not stop the worker."""
+        scheduler = FairScheduler(workers=1)
+        ran = threading.Event()
+        scheduler.submit('C1', 'U1', lambda: 1 / 0)
+        scheduler.submit('C1', 'U1', ran.set)
+        scheduler.start()
+        self.assertTrue(ran.wait(2))
+        scheduler.stop(timeout=2)
+    
+    def test_cancel_pending_returns_unstarted_jobs(self):
+        """Test that draining stops dispatch and hands back queued jobs."""
+        scheduler = FairScheduler(workers=1)
+        release = threading.Event()
+        started = threading.Event()
+        
+        def blocking_job():
+            started.set()
+            release.wait(2)
+        
+        scheduler.submit('C1', 'U1', blocking_job)
+        scheduler.start()
+        self.assertTrue(started.wait(2))
+        scheduler.submit('C2', 'U2', lambda: None)
+        scheduler.submit('C3', 'U3', lambda: None)
+        
+        pending = scheduler.cancel_pending()
+        self.assertEqual(sorted(job.channel for job in pending), ['C2', 'C3'])
+        self.assertEqual(scheduler.queue_depth(), 0)
+        self.assertEqual([job.channel for job in scheduler.in_flight()], ['C1'])
+        self.assertFalse(scheduler.wait_idle(timeout=0.05))
+        
+        release.set()
+        self.assertTrue(scheduler.wait_idle(timeout=2))
+        scheduler.stop(timeout=2)
+    
+    def test_configure_resizes_pool(self):
+        """Test growing and shrinking the worker pool while running."""
+        scheduler = FairScheduler(workers=1)
+        scheduler.start()
+        scheduler.configure(workers=3, channel_limit=1)
+        self.assertEqual(len(scheduler._threads), 3)
+        
+        scheduler.configure(workers=1, channel_limit=1)
+        for thread in scheduler._threads[1:]:
+            thread.join(2)
+        self.assertEqual(sum(thread.is_alive() for thread in scheduler._threads), 1)
+        
+        ran = threading.Event()
+        scheduler.submit('C1', 'U1', ran.set)
+        self.assertTrue(ran.wait(2))
+        scheduler.stop(timeout=2)
+    
+    def test_jobs_wait_for_memory_in_queue(self):
+        """Test that a job that does not fit stays queued instead of holding a worker."""
+        admission = AdmissionController(budget_bytes=100 * MB)
+        scheduler = FairScheduler(workers=2, admission=admission)
+        release = threading.Event()
+        started = threading.Event()
+        large_ran = threading.Event()
+        small_ran = threading.Event()
+        free_ran = threading.Event()
+        
+        def blocking_job():
+            started.set()
+            release.wait(2)
+        
+        scheduler.submit('C1', 'U1', blocking_job, memory=60 * MB)
+        scheduler.start()
+        self.assertTrue(started.wait(2))
+        scheduler.submit('C2', 'U2', large_ran.set, memory=60 * MB)
+        scheduler.submit('C3', 'U3', small_ran.set, memory=10 * MB)
+        scheduler.submit('C4', 'U4', free_ran.set)
+        
+        # The second worker is free for a job that needs no memory
+        self.assertTrue(free_ran.wait(2))
+        # The small job would fit, but not next to the memory reserved for the older large job
+        self.assertFalse(large_ran.is_set() or small_ran.is_set())
+        self.assertEqual(len(scheduler.in_flight()), 1)
+        self.assertEqual(admission.stats()['waiting'], 2)
+        
+        release.set()
+        self.assertTrue(large_ran.wait(2))
+        self.assertTrue(small_ran.wait(2))
+        self.assertTrue(scheduler.wait_idle(timeout=2))
+        self.assertEqual(admission.stats()['in_use_bytes'], 0)
+        scheduler.stop(timeout=2)
+    
+    def test_job_times_out_waiting_for_memory(self):
+        """Test that a job waiting longer than the admission timeout is answered, not run."""
+        admission = AdmissionController(budget_bytes=100 * MB)
+        scheduler = FairScheduler(workers=2, admission=admission, admission_timeout=0.05)
+        release = threading.Event()
+        started = threading.Event()
+        timed_out = threading.Event()
+        ran = threading.Event()
+        
+        def blocking_job():
+            started.set()
+            release.wait(5)
+        
+        scheduler.submit('C1', 'U1', blocking_job, memory=80 * MB)
+        scheduler.start()
+        self.assertTrue(started.wait(2))
+        scheduler.submit('C2', 'U2', ran.set, memory=50 * MB, on_timeout=timed_out.set)
+        
+        self.assertTrue(timed_out.wait(3))
+        self.assertFalse(ran.is_set())
+        self.assertEqual(admission.stats()['waiting'], 0)
+        release.set()
+        scheduler.stop(timeout=2)
+
+
+class TestBotScheduling(unittest.TestCase):
+    
+    def test_file_messages_are_queued(self):
+        """Test that file messages are handed to the scheduler."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = MagicMock()
+                    
+                    req = MagicMock()
+                    req.type = 'events_api'
+                    req.payload = {'event': {
+                        'type': 'message', 'channel': 'C1', 'user': 'U1',
+                        'files': [{'id': 'F1', 'name': 'a.csv'}]
+                    }}
+                    bot.process_request(MagicMock(), req)
+                    
+                    channel, user, _ = bot.scheduler.submit.call_args[0]
+                    self.assertEqual((channel, user), ('C1', 'U1'))
+    
+    def test_file_jobs_reserve_estimated_memory(self):
+        """Test that the estimate is passed to the scheduler to reserve before dispatch."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = MagicMock()
+                    
+                    bot.submit_file_job({'channel': 'C1', 'files': [{'name': 'a.csv', 'size': 10 * MB}]})
+                    self.assertEqual(bot.scheduler.submit.call_args[1]['memory'], 60 * MB)
+                    
+                    # Over the hard cap: rejected when it starts, so nothing is reserved
+                    bot.submit_file_job({'channel': 'C1', 'files': [{'name': 'b.csv', 'size': 500 * MB}]})
+                    self.assertEqual(bot.scheduler.submit.call_args[1]['memory'], 0)
+    
+    def test_health_reports_channel_waits(self):
+        """Test that per-channel queue-wait metrics are served on /readyz in single-process mode."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = FairScheduler(workers=1)
+                    ran = threading.Event()
+                    bot.scheduler.submit('C1', 'U1', ran.set)
+                    bot.scheduler.start()
+                    self.assertTrue(ran.wait(2))
+                    bot.scheduler.stop(timeout=2)
+                    
+                    channels = bot.health()['channels']
+                    self.assertEqual(channels['C1']['completed'], 1)
+                    self.assertIn('wait_p99', channels['C1'])
+    
+    def test_drain_finishes_in_flight_jobs(self):
+        """Test that draining waits for running jobs and answers cancelled ones."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = FairScheduler(workers=1)
+                    bot.send_error_message = MagicMock()
+                    started = threading.Event()
+                    finished = threading.Event()
+                    
+                    def slow_job():
+                        started.set()
+                        threading.Event().wait(0.2)
+                        finished.set()
+                    
+                    bot.scheduler.submit('C1', 'U1', slow_job)
+                    bot.scheduler.start()
+                    self.assertTrue(started.wait(2))
+                    bot.scheduler.submit('C2', 'U2', lambda: None)
+                    
+                    bot.drain(timeout=2)
+                    
+                    self.assertTrue(finished.is_set())
+                    bot.socket_client.disconnect.assert_called_once()
+                    bot.send_error_message.assert_called_once_with('C2', slack_bot.RETRY_MESSAGE)
+                    self.assertEqual(bot.drain_status()['state'], 'draining')
+                    self.assertEqual(bot.drain_status()['in_flight'], 0)
+    
+    def test_drain_replies_in_job_thread(self):
+        """Test that a cancelled job's retry message goes to the thread of the request."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = FairScheduler(workers=1)
+                    bot.send_error_message = MagicMock()
+                    bot.submit_file_job({'channel': 'C1', 'user': 'U1', 'ts': '111.222', 'files': []})
+                    
+                    bot.drain(timeout=0)
+                    
+                    bot.send_error_message.assert_called_once_with('C1', slack_bot.RETRY_MESSAGE, thread_ts='111.222')
+    
+    def test_drain_deadline_answers_unfinished_jobs(self):
+        """Test that jobs still running at the deadline get a retry message."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = FairScheduler(workers=1)
+                    bot.send_error_message = MagicMock()
+                    started = threading.Event()
+                    release = threading.Event()
+                    
+                    def stuck_job():
+                        started.set()
+                        release.wait(2)
+                    
+                    bot.scheduler.submit('C1', 'U1', stuck_job)
+                    bot.scheduler.start()
+                    self.assertTrue(started.wait(2))
+                    
+                    bot.drain(timeout=0.1)
+                    release.set()
+                    
+                    bot.send_error_message.assert_called_once_with('C1', slack_bot.RETRY_MESSAGE)
+    
+    def test_events_not_acknowledged_while_draining(self):
+        """Test that events received during drain are left for redelivery."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.scheduler = MagicMock()
+                    bot.draining.set()
+                    
+                    client = MagicMock()
+                    req = MagicMock()
+                    req.type = 'events_api'
+                    req.payload = {'event': {'type': 'message', 'channel': 'C1', 'files': []}}
+                    bot.process_request(client, req)
+                    
+                    client.send_socket_mode_response.assert_not_called()
+                    bot.scheduler.submit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.csv_processor import summarize_csv_files
+from slackbot_poc.stats import (
+    STATS_CHUNK_BYTES, STATS_EXPANSION_FACTOR, ColumnStats, chunk_rows, compute_stats, format_stats, merge_stats
+)
+
+
+class TestColumnStats(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a CSV with integer, float, text and empty values."""
+        self.csv = b"name,age,height\nAlice,25,5.5\nBob,,6.0\nCarol,31,4.25\nDan,20,\n"
+    
+    def test_compute_stats(self):
+        """Test count/min/max/mean/sum per column."""
+        stats = compute_stats(self.csv)
+        self.assertEqual(list(stats), ['name', 'age', 'height'])
+        self.assertEqual(stats['age'].count, 3)
+        self.assertEqual((stats['age'].min, stats['age'].max, stats['age'].total), (20, 31, 76))
+        self.assertAlmostEqual(stats['height'].mean, 15.75 / 3)
+        self.assertFalse(stats['name'].numeric)
+        self.assertEqual(stats['name'].count, 4)
+        self.assertIsNone(stats['name'].mean)
+    
+    def test_chunked_matches_single_pass(self):
+        """Test that streaming in small chunks gives the same result."""
+        self.assertEqual(compute_stats(self.csv, chunksize=1), compute_stats(self.csv))
+    
+    def test_merge_partial_results(self):
+        """Test that stats of separate chunks merge into the stats of the whole file."""
+        first = compute_stats(b"a,b\n1,x\n5,y\n")
+        second = compute_stats(b"a,b\n-2,3\n")
+        merged = merge_stats([first, second])
+        self.assertEqual(merged['a'], ColumnStats(count=3, total=4, min=-2, max=5))
+        self.assertEqual(merged['b'], ColumnStats(count=3, numeric=False))
+    
+    def test_column_numeric_in_one_chunk_only(self):
+        """Test that a column with text in a later chunk reports only its count."""
+        stats = compute_stats(b"a\n1\n2\nx\n", chunksize=2)
+        self.assertFalse(stats['a'].numeric)
+        self.assertEqual(stats['a'].count, 3)
+        self.assertIsNone(stats['a'].min)
+        self.assertIsNone(stats['a'].max)
+        data = b"a,b\n" + b"".join(b"%d,x\n" % (i % 3) for i in range(5)) + b"foo,y\n"
+        self.assertEqual(format_stats(compute_stats(data, chunksize=3)), format_stats(compute_stats(data)))
+        self.assertIn("a,6,,,,\n", format_stats(compute_stats(data, chunksize=3)))
+    
+    def test_integer_sum_does_not_overflow(self):
+        """Test that sums of large integers are exact instead of wrapping around."""
+        data = b"a\n" + b"%d\n" % 2 ** 62 * 4
+        stats = compute_stats(data, chunksize=2)
+        self.assertEqual(stats['a'].total, 2 ** 64)
+        self.assertEqual(stats['a'].mean, 2 ** 62)
+    
+    def test_format_stats(self):
+        """Test the table posted to Slack."""
+        expected = (
+            "column,count,min,max,mean,sum\n"
+            "name,4,,,,\n"
+            "age,3,20,31,25.3333,76\n"
+            "height,3,4.25,6,5.25,15.75\n"
+        )
+        self.assertEqual(format_stats(compute_stats(self.csv)), expected)
+    
+    def test_summarize_invalid_files(self):
+        """Test that invalid files get the usual error messages."""
+        results = summarize_csv_files([b"", b"a;b\n1;2\n", b"a,b\n1,2\n"])
+        self.assertEqual(results[0].error, "Please send csv file")
+        self.assertEqual(results[1].error, "Please send csv file with comma(,).")
+        self.assertTrue(results[2].ok)
+    
+    def test_summarize_from_path(self):
+        """Test that a file on disk gives the same table as its bytes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+            with open(path, 'wb') as f:
+                f.write(self.csv)
+            self.assertEqual(summarize_csv_files([path]), summarize_csv_files([self.csv]))
+            
+            with open(path, 'wb') as f:
+                f.write(b'  \n')
+            self.assertEqual(summarize_csv_files([path])[0].error, "Please send csv file")
+    
+    def test_chunk_rows_bounded_by_bytes(self):
+        """Test that wide rows get fewer rows per chunk."""
+        narrow = b"a,b\n1,2\n3,4\n"
+        wide = b"a\n" + b"x" * 1000 + b"\n"
+        self.assertEqual(chunk_rows(narrow), STATS_CHUNK_BYTES * 3 // len(narrow))
+        self.assertLess(chunk_rows(wide), chunk_rows(narrow))
+        self.assertGreaterEqual(chunk_rows(b"x" * 100), 1)
+
+
+class TestStatsMode(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a bot with mocked Slack clients."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    self.bot = slack_bot.SlackCSVBot()
+        self.bot.downloader = MagicMock()
+        self.bot.process_csv_files = MagicMock()
+    
+    def serve_files(self, *contents):
+        """Make the mocked downloader stream the given contents to disk, in order."""
+        contents = list(contents)
+        
+        def download_to_file(file, path):
+            with open(path, 'wb') as f:
+                f.write(contents.pop(0))
+        
+        self.bot.downloader.download_to_file.side_effect = download_to_file
+    
+    def test_stats_posted_inline(self):
+        """Test that stats mode posts a message and uploads nothing."""
+        self.serve_files(b"a,b\n1,2\n3,4\n")
+        event = {'channel': 'C1', 'text': 'stats please', 'files': [{'id': 'F1', 'name': 'data.csv', 'size': 12}]}
+        self.bot.handle_message_with_files(event, 'job1')
+        
+        self.bot.process_csv_files.assert_not_called()
+        self.bot.downloader.download.assert_not_called()
+        self.bot.client.files_upload_v2.assert_not_called()
+        text = self.bot.client.chat_postMessage.call_args[1]['text']
+        self.assertEqual(text, "Column stats for data.csv:\n```\ncolumn,count,min,max,mean,sum\na,2,1,3,2,4\nb,2,2,4,3,6\n\n```")
+    
+    def test_stats_reports_failed_files(self):
+        """Test that files that cannot be summarized are reported by name."""
+        self.serve_files(b"a,b\n1,2\n", b"a;b\n1;2\n")
+        files = [{'id': 'F1', 'name': 'good.csv'}, {'id': 'F2', 'name': 'bad.csv'}]
+        self.bot.handle_message_with_files({'channel': 'C1', 'text': 'stats', 'files': files})
+        self.bot.replies.flush()
+        
+        texts = [call[1]['text'] for call in self.bot.client.chat_postMessage.call_args_list]
+        self.assertTrue(texts[0].startswith("Column stats for good.csv:"))
+        self.assertEqual(texts[1], "bad.csv: Please send csv file with comma(,).")
+    
+    def test_stats_estimate_does_not_grow_with_file_size(self):
+        """Test that stats jobs are admitted by one chunk, not the whole file."""
+        small = [{'name': 'a.csv', 'size': 1024}]
+        huge = [{'name': 'b.csv', 'size': 2048 * 1024 * 1024}]
+        self.assertEqual(self.bot.estimate_job(small, stats=True), 1024 * STATS_EXPANSION_FACTOR)
+        self.assertEqual(self.bot.estimate_job(huge, stats=True), STATS_CHUNK_BYTES * STATS_EXPANSION_FACTOR)
+    
+    def test_stats_skips_preview(self):
+        """Test that large files in stats mode do not get a preview."""
+        self.bot.post_preview = MagicMock()
+        event = {'channel': 'C1', 'text': 'stats', 'files': [{'id': 'F1', 'name': 'big.csv', 'size': 500 * 1024 * 1024}]}
+        self.bot.maybe_post_preview(event)
+        self.bot.post_preview.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import queue
+import unittest
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.admission import MB
+from slackbot_poc.config import Settings
+from slackbot_poc.supervisor import Supervisor
+from slackbot_poc.main import build_parser
+
+
+def fake_process(pid, alive=True, exitcode=None):
+    """Create a stand-in for a worker process."""
+    process = MagicMock()
+    process.pid = pid
+    process.is_alive.return_value = alive
+    process.exitcode = exitcode
+    return process
+
+
+class TestSupervisor(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a supervisor whose workers are never really spawned."""
+        self.supervisor = Supervisor(2, heartbeat_interval=1, heartbeat_timeout=5)
+        self.next_pid = 100
+        
+        def spawn(slot):
+            self.next_pid += 1
+            slot.process = fake_process(self.next_pid)
+            slot.started_at = slot.last_heartbeat = time.monotonic()
+            slot.restart_at = None
+        
+        self.supervisor._spawn = spawn
+        for slot in self.supervisor.slots:
+            spawn(slot)
+    
+    def test_crashed_worker_is_restarted_with_backoff(self):
+        """Test that a crashed worker is scheduled for restart and then respawned."""
+        slot = self.supervisor.slots[0]
+        slot.process.is_alive.return_value = False
+        slot.process.exitcode = 1
+        
+        self.supervisor.check_workers()
+        self.assertEqual(slot.restarts, 1)
+        self.assertIsNotNone(slot.restart_at)
+        self.assertEqual(slot.backoff, 2.0)
+        
+        slot.restart_at = time.monotonic() - 1
+        self.supervisor.check_workers()
+        self.assertIsNone(slot.restart_at)
+        self.assertTrue(slot.process.is_alive())
+        self.assertEqual(self.supervisor.slots[1].restarts, 0)
+    
+    def test_hung_worker_is_killed(self):
+        """Test that a worker without heartbeats is killed and restarted."""
+        slot = self.supervisor.slots[1]
+        process = slot.process
+        slot.last_heartbeat = time.monotonic() - 10
+        
+        self.supervisor.check_workers()
+        
+        process.kill.assert_called_once()
+        self.assertEqual(slot.restarts, 1)
+    
+    def test_metrics_are_aggregated_across_workers(self):
+        """Test combining metrics snapshots from several workers."""
+        first, second = self.supervisor.slots
+        self.supervisor.metrics_queue = MagicMock()
+        self.supervisor.metrics_queue.get_nowait.side_effect = [
+            (0, first.process.pid, {
+                'channels': {'C1': {'queued': 2, 'running': 1, 'completed': 1, 'wait_avg': 0.2, 'wait_p99': 0.5,
+                                    'wait_max': 0.5}},
+                'memory': {'in_use_bytes': 100, 'running': 1, 'waiting': 0},
+            }),
+            (1, second.process.pid, {
+                'channels': {'C1': {'queued': 1, 'running': 2, 'completed': 3, 'wait_avg': 0.6, 'wait_p99': 1.2,
+                                    'wait_max': 1.5},
+                             'C2': {'queued': 0, 'running': 1, 'completed': 1, 'wait_max': 0.1}},
+                'memory': {'in_use_bytes': 50, 'running': 3, 'waiting': 2},
+            }),
+            # Stale snapshot from a previous process in the same slot is ignored
+            (1, 1, {'memory': {'in_use_bytes': 999}}),
+            queue.Empty(),
+        ]
+        
+        self.supervisor.collect_metrics()
+        metrics = self.supervisor.aggregate_metrics()
+        
+        c1 = metrics['channels']['C1']
+        self.assertEqual((c1['queued'], c1['running'], c1['completed']), (3, 3, 4))
+        self.assertAlmostEqual(c1['wait_avg'], 0.5)
+        self.assertEqual((c1['wait_p99'], c1['wait_max']), (1.2, 1.5))
+        self.assertEqual(metrics['channels']['C2']['running'], 1)
+        self.assertEqual(metrics['memory'], {'in_use_bytes': 150, 'running': 4, 'waiting': 2})
+        self.assertEqual([worker['alive'] for worker in metrics['workers']], [True, True])
+        
+        with self.assertLogs('slackbot_poc.supervisor', level='INFO') as logs:
+            self.supervisor.log_metrics()
+        self.assertIn('Channel C1: queued 3, running 3, completed 4, wait avg 0.500s p99 1.200s max 1.500s', logs.output[1])
+        self.assertEqual(len(logs.output), 3)
+    
+    def test_shutdown_terminates_workers(self):
+        """Test that shutdown asks every worker to drain."""
+        processes = [slot.process for slot in self.supervisor.slots]
+        for process in processes:
+            process.join.side_effect = lambda timeout=None, p=process: setattr(p.is_alive, 'return_value', False)
+        
+        self.supervisor.shutdown()
+        
+        for process in processes:
+            process.terminate.assert_called_once()
+            process.kill.assert_not_called()
+    
+    def test_workers_share_host_limits(self):
+        """Test that each worker process gets an equal share of memory and parse processes."""
+        settings = Settings(
+            slack_bot_token='xoxb-test', slack_app_token='xapp-test',
+            memory_budget_mb=2048, max_job_memory_mb=1024, parse_processes=8,
+        )
+        with patch('slackbot_poc.bot.WebClient'):
+            with patch('slackbot_poc.bot.SocketModeClient'):
+                bot = slack_bot.SlackCSVBot(settings, processes=4)
+        
+        self.assertEqual(bot.admission.budget_bytes, 512 * MB)
+        self.assertEqual(bot.admission.hard_cap_bytes, 512 * MB)
+        self.assertEqual(bot.parse_processes, 2)
+        
+        bot.apply_settings(settings)
+        self.assertEqual(bot.admission.budget_bytes, 512 * MB)
+
+
+class TestCommandLine(unittest.TestCase):
+    
+    def setUp(self):
+        """Keep main() away from the developer's .env and the global logging setup."""
+        settings = Settings(slack_bot_token='xoxb-test', slack_app_token='xapp-test')
+        for target, kwargs in (
+            ('slackbot_poc.main.load_settings', {'return_value': settings}),
+            ('slackbot_poc.main.configure_logging', {}),
+        ):
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def test_serve_workers_option(self):
+        """Test parsing the serve command."""
+        args = build_parser().parse_args(['serve', '--workers', '4'])
+        self.assertEqual(args.command, 'serve')
+        self.assertEqual(args.workers, 4)
+    
+    def test_no_command_runs_single_bot(self):
+        """Test that running without a command starts one in-process bot."""
+        with patch('slackbot_poc.main.SlackCSVBot') as bot_class:
+            with patch('slackbot_poc.main.Supervisor') as supervisor_class:
+                from slackbot_poc.main import main
+                main([])
+                bot_class.return_value.start.assert_called_once()
+                supervisor_class.assert_not_called()
+    
+    def test_multiple_workers_use_supervisor(self):
+        """Test that --workers N starts the supervisor."""
+        with patch('slackbot_poc.main.SlackCSVBot') as bot_class:
+            with patch('slackbot_poc.main.Supervisor') as supervisor_class:
+                from slackbot_poc.main import main
+                main(['serve', '--workers', '3'])
+                self.assertEqual(supervisor_class.call_args[0][0], 3)
+                supervisor_class.return_value.run.assert_called_once()
+                bot_class.assert_not_called()
+    
+    def test_missing_tokens_exit(self):
+        """Test that main() exits with a config error instead of starting without tokens."""
+        with patch('slackbot_poc.main.load_settings', return_value=Settings()):
+            with patch('slackbot_poc.main.SlackCSVBot') as bot_class:
+                with patch('sys.stderr'):
+                    with self.assertRaises(SystemExit) as ctx:
+                        from slackbot_poc.main import main
+                        main([])
+                self.assertEqual(ctx.exception.code, 2)
+                bot_class.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
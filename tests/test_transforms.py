@@ -0,0 +1,135 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import slackbot_poc.bot as slack_bot
+from slackbot_poc.csv_processor import process_csv_files, process_csv_files_tolerant
+from slackbot_poc.transforms import (
+    Transform,
+    TransformError,
+    TRANSFORMS,
+    apply_transforms,
+    describe_transforms,
+    parse_transforms,
+    register_transform,
+)
+
+
+class TestParseTransforms(unittest.TestCase):
+    
+    def test_no_transforms(self):
+        """Test that ordinary messages declare no transforms."""
+        self.assertEqual(parse_transforms("here is the report, please round it"), [])
+        self.assertEqual(parse_transforms(None), [])
+    
+    def test_transforms_with_columns(self):
+        """Test parsing transforms restricted to columns."""
+        result = parse_transforms("please scale=3 round=1 cols=Age,score")
+        self.assertEqual(result, [
+            Transform('scale', 3.0, ('Age', 'score')),
+            Transform('round', 1.0, ('Age', 'score')),
+        ])
+    
+    def test_invalid_argument(self):
+        """Test that a malformed argument raises TransformError."""
+        with self.assertRaises(TransformError):
+            parse_transforms("scale=lots")
+    
+    def test_columns_without_transform(self):
+        """Test that cols= alone is an error instead of the default transforms on every column."""
+        with self.assertRaises(TransformError) as ctx:
+            parse_transforms("cols=a,b")
+        self.assertIn("cols= needs a transform", str(ctx.exception))
+        self.assertEqual(parse_transforms("double cols=a"), [Transform('double', None, ('a',))])
+    
+    def test_describe(self):
+        """Test the human readable summary."""
+        self.assertEqual(describe_transforms(parse_transforms("scale=3 add=0.5 cols=a")),
+                         "multiplied by 3 (a), added 0.5 (a)")
+
+
+class TestApplyTransforms(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a frame with integer, float and text columns."""
+        self.df = pd.DataFrame({'name': ['Alice', 'Bob'], 'age': [25, 30], 'height': [5.55, 6.04]})
+    
+    def test_default_doubles_integers(self):
+        """Test that no transforms means doubling integer columns."""
+        result = apply_transforms(self.df)
+        self.assertEqual(result['age'].tolist(), [50, 60])
+        self.assertEqual(result['height'].tolist(), [5.55, 6.04])
+    
+    def test_chained_transforms(self):
+        """Test that transforms are composed per column."""
+        result = apply_transforms(self.df, parse_transforms("scale=2 round=1"))
+        self.assertEqual(result['age'].tolist(), [50, 60])
+        self.assertEqual(str(result['age'].dtype), 'int64')
+        self.assertEqual(result['height'].tolist(), [11.1, 12.1])
+        self.assertEqual(result['name'].tolist(), ['Alice', 'Bob'])
+    
+    def test_explicit_columns(self):
+        """Test that cols= limits the transform to the named columns."""
+        result = apply_transforms(self.df, parse_transforms("add=1 cols=height"))
+        self.assertEqual(result['age'].tolist(), [25, 30])
+        self.assertAlmostEqual(result['height'].tolist()[0], 6.55)
+    
+    def test_bad_columns(self):
+        """Test errors for missing or non-numeric columns."""
+        with self.assertRaises(TransformError):
+            apply_transforms(self.df, parse_transforms("scale=2 cols=weight"))
+        with self.assertRaises(TransformError):
+            apply_transforms(self.df, parse_transforms("scale=2 cols=name"))
+    
+    def test_register_custom_transform(self):
+        """Test registering a new transform."""
+        @register_transform("negate", description="negated")
+        def negate(series, arg):
+            return -series
+        
+        try:
+            result = apply_transforms(self.df, parse_transforms("negate cols=age"))
+            self.assertEqual(result['age'].tolist(), [-25, -30])
+        finally:
+            del TRANSFORMS["negate"]
+
+
+class TestTransformProcessing(unittest.TestCase):
+    
+    def test_process_with_transforms(self):
+        """Test that the CSV functions apply requested transforms."""
+        csv = b"name,age,height\nAlice,25,5.55\nBob,30,6.04"
+        transforms = parse_transforms("scale=3 round=0")
+        expected = "name,age,height\nAlice,75,17.0\nBob,90,18.0\n"
+        self.assertEqual(process_csv_files([csv], transforms), [expected])
+        self.assertEqual(process_csv_files_tolerant([csv], transforms)[0].content, expected)
+    
+    def test_bot_reports_transform_errors(self):
+        """Test that the bot replies with the error for a bad transform request."""
+        with patch.dict('os.environ', {'SLACK_BOT_TOKEN': 'test', 'SLACK_APP_TOKEN': 'test'}):
+            with patch('slackbot_poc.bot.WebClient'):
+                with patch('slackbot_poc.bot.SocketModeClient'):
+                    bot = slack_bot.SlackCSVBot()
+                    bot.send_error_message = MagicMock()
+                    bot.process_csv_files = MagicMock()
+                    
+                    event = {'channel': 'C1', 'text': 'scale=abc', 'files': [{'id': 'F1', 'name': 'a.csv'}]}
+                    bot.handle_message_with_files(event)
+                    
+                    bot.send_error_message.assert_called_once_with('C1', 'Invalid value for scale: abc')
+                    bot.process_csv_files.assert_not_called()
+                    
+                    event['text'] = 'scale=3 cols=a'
+                    bot.handle_message_with_files(event)
+                    transforms = bot.process_csv_files.call_args[0][3]
+                    self.assertEqual(transforms, [Transform('scale', 3.0, ('a',))])
+
+
+if __name__ == '__main__':
+    unittest.main()